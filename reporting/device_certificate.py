@@ -32,45 +32,63 @@ Usage:
 
 Requirements:
   pip install requests-oauthlib
+  pip install lxml            # optional, faster lshw XML parsing
+  pip install orjson          # optional, faster JSON decoding
 """
 
 import argparse
 import base64
+import contextlib
+import functools
+import hashlib
+import io
 import json
 import os
 import re
+import string
 import sys
-import xml.etree.ElementTree as ET
+import threading
+import time
+from collections import defaultdict
 from datetime import datetime, timezone
 from html import escape
+from itertools import chain
+from operator import itemgetter
 from pathlib import Path
+from typing import Iterable, Iterator
+
+# Heavier modules (orjson, concurrent.futures, gzip, requests) are imported
+# where first used, so --help/--version and file mode don't pay for them.
 
 __version__ = "3.2.1"
 
 # ---------------------------------------------------------------------------
 # .env file support — load key=value pairs into os.environ
 # ---------------------------------------------------------------------------
+# KEY=value lines of a .env file; blank lines and # comments never match
+_DOTENV_LINE_RE = re.compile(r"^[ \t]*([^#=\s][^=\n]*)=([^\n]*)$", re.M)
+
+
+@functools.lru_cache(maxsize=1)
 def _load_dotenv() -> None:
     """Load .env file from the repo root (parent of reporting/) if it exists."""
     env_path = Path(__file__).resolve().parent.parent / ".env"
     if not env_path.is_file():
         return
-    with env_path.open() as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-            key, _, value = line.partition("=")
-            key, value = key.strip(), value.strip().strip("\"'")
-            if key and key not in os.environ:
-                os.environ[key] = value
-
-_load_dotenv()
+    for m in _DOTENV_LINE_RE.finditer(env_path.read_text()):
+        key, value = m.group(1).strip(), m.group(2).strip().strip("\"'")
+        if key not in os.environ:
+            os.environ[key] = value
 
 # ---------------------------------------------------------------------------
 # MAAS API CLIENT
 # ---------------------------------------------------------------------------
 
+# lshw XML starts with a declaration or <list>/<node>; MAAS may capture a
+# little stderr ahead of it, so look a bounded way in rather than at byte 0
+_LSHW_SNIFF_RE = re.compile(rb"<\?xml|<list>|<node")
+_LSHW_SNIFF_BYTES = 64 * 1024
+
 GPU_SCRIPTS = [
     "97-nexgen-gpu-install-580-12.8",
     "98-nexgen-gpu-inventory",
@@ -85,13 +103,37 @@ SCRIPT_ALIASES = {
 }
 
 
+def _memoize_per_machine(method):
+    """Memoize a MAASClient lookup on its positional args, per client instance.
+
+    Machine details and script outputs don't change during a run, so repeat
+    calls (retries, batch runs sharing a client) are served from memory.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args):
+        key = (method.__name__, *args)
+        try:
+            return self._memo[key]
+        except KeyError:
+            pass
+        value = self._memo[key] = method(self, *args)
+        return value
+    return wrapper
+
+
 class MAASClient:
     """Minimal MAAS REST API client with OAuth1 PLAINTEXT auth."""
 
-    def __init__(self, maas_url: str, api_key: str):
+    FETCH_WORKERS = 4
+    HOST_WORKERS = 4  # machines fetched concurrently in a batch run
+
+    def __init__(self, maas_url: str, api_key: str,
+                 cache_dir: str | None = None, max_age: float = 3600):
         try:
             from oauthlib.oauth1 import SIGNATURE_PLAINTEXT
+            from requests.adapters import HTTPAdapter
             from requests_oauthlib import OAuth1Session
+            from urllib3.util.retry import Retry
         except ImportError:
             print(
                 "Error: requests-oauthlib is required for MAAS API mode.\n"
@@ -119,19 +161,128 @@ class MAASClient:
             resource_owner_secret=token_secret,
             signature_method=SIGNATURE_PLAINTEXT,
         )
-
-    def _get(self, path: str, params: dict | None = None) -> "requests.Response":
+        # lshw XML and machine-resources JSON are large and compress well;
+        # requests decompresses transparently. One kept-alive connection
+        # pool (sized for fetch_all) serves every call in the run, and
+        # transient gateway errors are retried with backoff. The pool is
+        # sized for HOST_WORKERS machines each running fetch_all at once.
+        self.session.headers.update({
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        })
+        retry = Retry(total=3, backoff_factor=0.3,
+                      status_forcelist=(502, 503, 504), raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=self.FETCH_WORKERS,
+                              pool_maxsize=self.FETCH_WORKERS * self.HOST_WORKERS,
+                              max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Full current-commissioning payload per system_id; every script
+        # lookup is served from here instead of a filtered round-trip.
+        # _cache_lock only guards the dicts; each machine's download runs
+        # under its own lock, so different machines fetch concurrently.
+        self._commissioning_cache: dict[str, dict] = {}
+        self._machine_locks: dict[str, threading.Lock] = {}
+        self._cache_lock = threading.Lock()
+        self._memo: dict[tuple, object] = {}  # see _memoize_per_machine
+
+        # Optional on-disk response cache (see _get)
+        self.cache_dir = Path(cache_dir).expanduser() if cache_dir else None
+        self.max_age = max_age
+        if self.cache_dir:
+            self.cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+
+    def _get(self, path: str, params: dict | None = None,
+             revalidate=None) -> "requests.Response":
+        """GET an API path, through the on-disk cache when enabled.
+
+        A cached response older than max_age is normally refetched; if
+        revalidate(cached) says it is still current, it is kept instead.
+        """
         url = f"{self.api}/{path.lstrip('/')}"
-        resp = self.session.get(url, params=params or {})
+        params = params or {}
+        cache_key = None
+        if self.cache_dir:
+            cache_key = hashlib.sha256(
+                f"{url}?{sorted(params.items())}".encode()
+            ).hexdigest()
+            cached, age = self._cache_load(cache_key)
+            if cached is not None:
+                if age <= self.max_age:
+                    return cached
+                if revalidate is not None and revalidate(cached):
+                    self._cache_touch(cache_key)  # restart its max_age
+                    return cached
+        resp = self.session.get(url, params=params)
         resp.raise_for_status()
+        if cache_key:
+            self._cache_store(cache_key, resp)
         return resp
 
+    # -- On-disk response cache --
+
+    def _cache_load(self, key: str) -> tuple["requests.Response | None", float]:
+        """Return a cached response and its age in seconds, or (None, 0)."""
+        from requests.models import Response
+        from requests.structures import CaseInsensitiveDict
+        from requests.utils import get_encoding_from_headers
+
+        body_path = self.cache_dir / f"{key}.bin"
+        meta_path = self.cache_dir / f"{key}.meta.json"
+        try:
+            meta = json.loads(meta_path.read_text())
+            age = time.time() - meta["fetched_at"]
+            body = body_path.read_bytes()
+        except (OSError, ValueError, KeyError):
+            return None, 0
+        resp = Response()
+        resp._content = body
+        resp.status_code = meta.get("status_code", 200)
+        resp.url = meta.get("url", "")
+        resp.headers = CaseInsensitiveDict(meta.get("headers", {}))
+        resp.encoding = get_encoding_from_headers(resp.headers)
+        return resp, age
+
+    def _cache_store(self, key: str, resp: "requests.Response") -> None:
+        """Write a response body plus a small metadata sidecar."""
+        meta = {
+            "url": resp.url,
+            "status_code": resp.status_code,
+            # Body is stored decoded, so transfer headers no longer apply
+            "headers": {k: v for k, v in resp.headers.items()
+                        if k.lower() == "content-type"},
+            "fetched_at": time.time(),
+        }
+        try:
+            self._cache_write(key, ".bin", resp.content)
+            self._cache_write(key, ".meta.json", json.dumps(meta).encode())
+        except OSError as e:
+            print(f"Warning: could not write response cache: {e}", file=sys.stderr)
+
+    def _cache_touch(self, key: str) -> None:
+        """Reset a cached response's age; only the metadata sidecar is rewritten."""
+        meta_path = self.cache_dir / f"{key}.meta.json"
+        try:
+            meta = json.loads(meta_path.read_text())
+            meta["fetched_at"] = time.time()
+            self._cache_write(key, ".meta.json", json.dumps(meta).encode())
+        except (OSError, ValueError) as e:
+            print(f"Warning: could not refresh response cache: {e}", file=sys.stderr)
+
+    def _cache_write(self, key: str, suffix: str, data: bytes) -> None:
+        """Atomically replace one cache file (write a temp file, then rename)."""
+        final = self.cache_dir / f"{key}{suffix}"
+        tmp = final.with_name(f"{final.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, final)
+
     # -- Machine lookup --
 
     def resolve_hostname(self, hostname: str) -> dict:
         """Find machine by hostname, return full machine dict."""
         resp = self._get("machines/", {"hostname": hostname})
-        machines = resp.json()
+        machines = _json_loads(resp.content)
         if not machines:
             print(f"Error: No machine found with hostname '{hostname}'", file=sys.stderr)
             sys.exit(1)
@@ -144,10 +295,43 @@ class MAASClient:
             )
         return machines[0]
 
+    @_memoize_per_machine
     def get_machine_details(self, system_id: str) -> dict:
         """Full machine details (CPU, RAM, disks, NICs, NUMA, hardware_info)."""
-        return self._get(f"machines/{system_id}/").json()
-
+        return _json_loads(self._get(f"machines/{system_id}/").content)
+
+    def fetch_all(self, system_id: str) -> dict:
+        """Concurrently fetch machine details and the commissioning results.
+
+        The two GETs are independent, so wall time is max(RTT) rather than
+        the sum. The commissioning payload lands in the client cache, so the
+        script/lshw/machine-resources accessors that follow need no I/O.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=self.FETCH_WORKERS) as pool:
+            details = pool.submit(self.get_machine_details, system_id)
+            commissioning = pool.submit(self.get_commissioning_results, system_id)
+            return {
+                "details": details.result(),
+                "commissioning": commissioning.result(),
+            }
+
+    def forget(self, system_id: str) -> None:
+        """Drop one machine's in-memory payloads once its report is built.
+
+        A client shared across a batch otherwise keeps every host's
+        commissioning output alive until the run ends. Only the dict lock
+        is taken, so this never waits on another host's download.
+        """
+        with self._cache_lock:
+            self._commissioning_cache.pop(system_id, None)
+            self._machine_locks.pop(system_id, None)
+        # list() snapshots the keys; other hosts' threads may be inserting
+        for key in [k for k in list(self._memo) if system_id in k[1:]]:
+            self._memo.pop(key, None)
+
+    @_memoize_per_machine
     def get_machine_lshw(self, system_id: str) -> bytes | None:
         """Fetch lshw XML via commissioning script output."""
         log = lambda m: print(f"[maas-report]   lshw: {m}", file=sys.stderr)
@@ -160,47 +344,32 @@ class MAASClient:
             "00-maas-00-lshw",
         ]
 
-        # Strategy 1: Try each name via commissioning results API
-        for script_name in lshw_names:
-            try:
-                data = self.get_commissioning_results(system_id, [script_name])
-                results = data.get("results", [])
-                if not results:
-                    continue
-                log(f"found {len(results)} result(s) for '{script_name}'")
-                for result in results:
-                    name = result.get("name", "")
-                    stdout_b64 = result.get("stdout", "")
-                    if stdout_b64:
-                        raw = base64.b64decode(stdout_b64)
-                        if b"<?xml" in raw or b"<list>" in raw or b"<node" in raw:
-                            log(f"got {len(raw)} bytes XML from {name}")
-                            return raw
-                        else:
-                            log(f"{name}: {len(raw)} bytes but not XML")
-            except Exception:
-                continue
-
-        # Strategy 2: Fetch ALL commissioning results, find anything with lshw
+        # Strategy 1: Search the (cached) commissioning results -- known
+        # names first, then anything else with lshw in its name
         try:
-            log("trying unfiltered search for lshw scripts...")
-            data = self.get_commissioning_results(system_id)
-            for result in data.get("results", []):
+            results = self.get_commissioning_results(system_id).get("results", [])
+            by_name = {r.get("name", ""): r for r in results}
+            candidates = [by_name[n] for n in lshw_names if n in by_name]
+            candidates += [
+                r for r in results
+                if "lshw" in r.get("name", "").lower() and r.get("name") not in lshw_names
+            ]
+            for result in candidates:
                 name = result.get("name", "")
-                if "lshw" in name.lower():
-                    stdout_b64 = result.get("stdout", "")
-                    if stdout_b64:
-                        raw = base64.b64decode(stdout_b64)
-                        if b"<?xml" in raw or b"<list>" in raw or b"<node" in raw:
-                            log(f"found lshw as '{name}' — {len(raw)} bytes")
-                            return raw
+                raw = _result_stdout(result)
+                if not raw:
+                    continue
+                if _LSHW_SNIFF_RE.search(raw, 0, _LSHW_SNIFF_BYTES):
+                    log(f"got {len(raw)} bytes XML from {name}")
+                    return raw
+                log(f"{name}: {len(raw)} bytes but not XML")
             log("no lshw script found in commissioning results")
         except Exception as e:
-            log(f"unfiltered search failed: {e}")
+            log(f"commissioning results lookup failed: {e}")
 
-        # Strategy 3: ?op=details BSON (requires pymongo)
+        # Strategy 2: ?op=details BSON (requires pymongo)
         try:
-            import bson
+            bson = _load_bson()
             resp = self._get(f"machines/{system_id}/", {"op": "details"})
             details = bson.BSON(resp.content).decode()
             lshw_data = details.get("lshw", b"")
@@ -215,6 +384,7 @@ class MAASClient:
         log("all strategies exhausted — no lshw data")
         return None
 
+    @_memoize_per_machine
     def get_machine_resources(self, system_id: str) -> dict | None:
         """Fetch machine-resources JSON (detailed PCI, memory, etc)."""
         names = [
@@ -222,84 +392,89 @@ class MAASClient:
             "machine-resources",
             "maas-machine-resources",
         ]
-        # Try specific names first
-        for script_name in names:
-            try:
-                data = self.get_commissioning_results(system_id, [script_name])
-                for result in data.get("results", []):
-                    if "machine-resources" in result.get("name", "") or result.get("name", "") == script_name:
-                        stdout_b64 = result.get("stdout", "")
-                        if stdout_b64:
-                            raw = base64.b64decode(stdout_b64).decode("utf-8", errors="replace")
-                            return _extract_json(raw)
-            except Exception:
-                continue
-
-        # Fallback: search all results
         try:
-            data = self.get_commissioning_results(system_id)
-            for result in data.get("results", []):
-                name = result.get("name", "")
-                if "machine-resources" in name or "machine_resources" in name:
-                    stdout_b64 = result.get("stdout", "")
-                    if stdout_b64:
-                        raw = base64.b64decode(stdout_b64).decode("utf-8", errors="replace")
-                        return _extract_json(raw)
+            results = self.get_commissioning_results(system_id).get("results", [])
+            by_name = {r.get("name", ""): r for r in results}
+            # Known names first, then any result that looks like machine-resources
+            candidates = [by_name[n] for n in names if n in by_name]
+            candidates += [
+                r for r in results
+                if r.get("name") not in names
+                and ("machine-resources" in r.get("name", "")
+                     or "machine_resources" in r.get("name", ""))
+            ]
+            for result in candidates:
+                if _result_stdout(result):
+                    return _extract_json(_result_text(result))
         except Exception as e:
             print(f"Warning: machine-resources fetch failed: {e}", file=sys.stderr)
         return None
 
-    def get_commissioning_script_stdout(
-        self, system_id: str, script_name_hint: str
-    ) -> str | None:
-        """Fetch raw stdout of a commissioning script by partial name match."""
-        try:
-            # Try exact name first
-            data = self.get_commissioning_results(system_id, [script_name_hint])
-            results = data.get("results", [])
-            if results:
-                stdout_b64 = results[0].get("stdout", "")
-                if stdout_b64:
-                    return base64.b64decode(stdout_b64).decode("utf-8", errors="replace")
-            # Search all results
-            data = self.get_commissioning_results(system_id)
-            for result in data.get("results", []):
-                name = result.get("name", "")
-                if script_name_hint.lower() in name.lower():
-                    stdout_b64 = result.get("stdout", "")
-                    if stdout_b64:
-                        return base64.b64decode(stdout_b64).decode("utf-8", errors="replace")
-        except Exception as e:
-            print(f"Warning: Could not fetch {script_name_hint}: {e}", file=sys.stderr)
-        return None
-
     # -- Commissioning results --
 
     def get_commissioning_results(
         self, system_id: str, script_names: list[str] | None = None
     ) -> dict:
-        """Fetch current commissioning results, optionally filtered by script names."""
-        params = {"include_output": "1"}
-        if script_names:
-            params["filters"] = ",".join(script_names)
-        resp = self._get(
-            f"nodes/{system_id}/results/current-commissioning/", params
-        )
-        return resp.json()
+        """Fetch current commissioning results, optionally filtered by script names.
+
+        The unfiltered payload (with output) is downloaded once per machine;
+        name filters are applied client-side against the cached copy.
+        """
+        with self._cache_lock:
+            data = self._commissioning_cache.get(system_id)
+            machine_lock = self._machine_locks.setdefault(system_id, threading.Lock())
+        if data is None:
+            # Threads for the same machine wait for one download; others don't
+            with machine_lock:
+                with self._cache_lock:
+                    data = self._commissioning_cache.get(system_id)
+                if data is None:
+                    resp = self._get(
+                        f"nodes/{system_id}/results/current-commissioning/",
+                        {"include_output": "1"},
+                        revalidate=functools.partial(self._results_unchanged, system_id),
+                    )
+                    data = _json_loads(resp.content)
+                    with self._cache_lock:
+                        data = self._commissioning_cache.setdefault(system_id, data)
+        if not script_names:
+            return data
+        wanted = set(script_names)
+        return {
+            **data,
+            "results": [r for r in data.get("results", []) if r.get("name") in wanted],
+        }
+
+    def _results_unchanged(self, system_id: str, cached: "requests.Response") -> bool:
+        """True if no script result changed since the cached payload was stored.
+
+        Results are matched on (id, updated) from a listing without output,
+        so unchanged script bodies are not downloaded again.
+        """
+        try:
+            old = _json_loads(cached.content).get("results", [])
+        except ValueError:
+            return False
+        resp = self.session.get(f"{self.api}/nodes/{system_id}/results/current-commissioning/")
+        resp.raise_for_status()
+        new = _json_loads(resp.content).get("results", [])
+        stamps = {r.get("id"): r.get("updated") for r in old}
+        if None in stamps.values():
+            return False
+        return stamps == {r.get("id"): r.get("updated") for r in new}
 
+    @_memoize_per_machine
     def get_script_json(self, system_id: str, script_name: str) -> dict | None:
         """Fetch a specific script's stdout and parse as JSON."""
         try:
             data = self.get_commissioning_results(system_id, [script_name])
             for result in data.get("results", []):
-                if result.get("name") == script_name:
-                    stdout_b64 = result.get("stdout", "")
-                    if stdout_b64:
-                        raw = base64.b64decode(stdout_b64).decode("utf-8", errors="replace")
-                        # Our scripts output JSON to stdout but logs to stderr.
-                        # The stdout may have leading/trailing non-JSON text if
-                        # MAAS captured combined output. Try to extract JSON.
-                        return _extract_json(raw)
+                if result.get("name") == script_name and _result_stdout(result):
+                    raw = _result_text(result)
+                    # Our scripts output JSON to stdout but logs to stderr.
+                    # The stdout may have leading/trailing non-JSON text if
+                    # MAAS captured combined output. Try to extract JSON.
+                    return _extract_json(raw)
             return None
         except Exception as e:
             print(f"Warning: Could not fetch {script_name}: {e}", file=sys.stderr)
@@ -336,29 +511,97 @@ class MAASClient:
             return None
 
 
+_DECODE_LOCK = threading.Lock()
+
+
+def _result_stdout(result: dict) -> bytes:
+    """Decoded stdout of a commissioning result, base64-decoded at most once.
+
+    The decoded bytes are memoized on the (cached) result record and the
+    base64 string is dropped, since it is ~1.33x the size of the payload.
+    """
+    raw = result.get("_decoded")
+    if raw is None:
+        with _DECODE_LOCK:  # result records are shared across fetch threads
+            raw = result.get("_decoded")
+            if raw is None:
+                stdout_b64 = result.get("stdout") or ""
+                raw = result["_decoded"] = base64.b64decode(stdout_b64) if stdout_b64 else b""
+                result["stdout"] = None
+    return raw
+
+
+def _result_text(result: dict) -> str:
+    """Decoded stdout of a commissioning result as text."""
+    return _result_stdout(result).decode("utf-8", errors="replace")
+
+
+@functools.cache
+def _orjson():
+    """orjson module if installed (optional: faster decoding of large payloads)."""
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return orjson
+
+
+# 19+ digit runs: integers past the 64-bit range may be among them
+_WIDE_INT_RE = re.compile(r"\d{19}")
+_WIDE_INT_RE_BYTES = re.compile(rb"\d{19}")
+
+
+def _json_loads(data: bytes | str):
+    """json.loads, via orjson when installed.
+
+    orjson rejects NaN/Infinity, which are re-tried with json. It also
+    turns integers wider than 64 bits into floats instead of failing, so
+    input with any 19+ digit run goes straight to json. The result is
+    the same as json.loads either way, and invalid input raises
+    json.JSONDecodeError.
+    """
+    orjson = _orjson()
+    if orjson is not None:
+        wide = _WIDE_INT_RE_BYTES if isinstance(data, (bytes, bytearray)) else _WIDE_INT_RE
+        if not wide.search(data):
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
+                pass
+    return json.loads(data)
+
+
+_JSON_DECODER = json.JSONDecoder()
+_BRACE_RE = re.compile(r"[{}]")
+
+
 def _extract_json(text: str) -> dict | None:
     """Extract the first valid JSON object from text that may have non-JSON content."""
     text = text.strip()
     # Try direct parse first
     try:
-        return json.loads(text)
+        return _json_loads(text)
     except json.JSONDecodeError:
         pass
-    # Find first { and try progressively larger substrings
+    # Decode the first top-level object that parses cleanly; raw_decode
+    # stops at the end of that object and ignores trailing text
+    decoder = _JSON_DECODER
     start = text.find("{")
-    if start < 0:
-        return None
-    depth = 0
-    for i in range(start, len(text)):
-        if text[i] == "{":
-            depth += 1
-        elif text[i] == "}":
-            depth -= 1
+    while start >= 0:
+        try:
+            return decoder.raw_decode(text, start)[0]
+        except json.JSONDecodeError:
+            pass
+        # Resume after the failed candidate's whole brace span, never inside
+        # it: a nested object of truncated output is not the payload
+        depth = 0
+        for m in _BRACE_RE.finditer(text, start):
+            depth += 1 if m.group() == "{" else -1
             if depth == 0:
-                try:
-                    return json.loads(text[start : i + 1])
-                except json.JSONDecodeError:
-                    pass
+                break
+        else:
+            return None  # unbalanced to the end: truncated
+        start = text.find("{", m.end())
     return None
 
 
@@ -366,61 +609,183 @@ def _extract_json(text: str) -> dict | None:
 # LSHW XML PARSING -- DIMM INVENTORY
 # ---------------------------------------------------------------------------
 
-def parse_lshw_dimms(lshw_xml: bytes | None) -> list[dict]:
-    """Parse lshw XML to extract DIMM slot inventory.
-    
-    Filters out cache, system board, and memory controller nodes.
-    Only returns actual populated DIMM slots.
+def parse_lshw_nodes(lshw_xml: bytes | str | None) -> list[dict]:
+    """Parse lshw XML once into lightweight <node> records, in document order.
+
+    The document is streamed with iterparse and each element is cleared as
+    soon as its record is built, so the full tree is never materialised.
+    Each record carries the node's id/class attributes, whether it has
+    child <node> elements, and for the direct children named in
+    _LSHW_FIELDS: stripped text and ``units`` attribute (first occurrence
+    per tag), plus the (id, value) pairs of its <configuration><setting>
+    entries.
     """
     if not lshw_xml:
         return []
+    if isinstance(lshw_xml, str):
+        lshw_xml = lshw_xml.encode("utf-8")
+    # Skip any non-XML preamble MAAS captured ahead of the document
+    idx = lshw_xml.find(b"<?xml")
+    if idx > 0:
+        lshw_xml = lshw_xml[idx:]
+    elif idx < 0:
+        idx = lshw_xml.find(b"<list")
+        if idx < 0:
+            idx = lshw_xml.find(b"<node")
+        if idx > 0:
+            lshw_xml = lshw_xml[idx:]
+
+    records: list[dict] = []
+    open_nodes: list[dict] = []
     try:
-        if isinstance(lshw_xml, bytes):
-            idx = lshw_xml.find(b"<?xml")
-            if idx > 0:
-                lshw_xml = lshw_xml[idx:]
-            elif idx < 0:
-                idx = lshw_xml.find(b"<list")
-                if idx < 0:
-                    idx = lshw_xml.find(b"<node")
-                if idx > 0:
-                    lshw_xml = lshw_xml[idx:]
-        root = ET.fromstring(lshw_xml)
-    except ET.ParseError as e:
+        for event, el in _iterparse_nodes(lshw_xml):
+            if event == "start":
+                rec = {
+                    "id": el.get("id", ""),
+                    "class": el.get("class", ""),
+                    "has_child_node": False,
+                }
+                if open_nodes:
+                    open_nodes[-1]["has_child_node"] = True
+                open_nodes.append(rec)
+                records.append(rec)
+                continue
+
+            rec = open_nodes.pop()
+            text: dict[str, str] = {}
+            units: dict[str, str] = {}
+            settings: list[tuple[str, str]] = []
+            for child in el:
+                tag = child.tag
+                if tag == "configuration":
+                    if not settings:
+                        settings = [
+                            ((st.get("id", "") or "").lower(), st.get("value", "") or "")
+                            for st in child.iter("setting")
+                        ]
+                    continue
+                if tag not in _LSHW_FIELDS or tag in text:
+                    continue  # nested nodes, unused fields, repeats, comments/PIs
+                text[tag] = child.text.strip() if child.text else ""
+                unit = child.get("units")
+                if unit is not None:
+                    units[tag] = unit
+            rec["text"] = text
+            rec["units"] = units
+            rec["settings"] = settings
+            el.clear()
+    except _xml_modules()[2] as e:
         print(f"Warning: lshw XML parse error: {e}", file=sys.stderr)
-        if lshw_xml:
-            print(f"  XML starts with: {lshw_xml[:200]!r}", file=sys.stderr)
+        print(f"  XML starts with: {lshw_xml[:200]!r}", file=sys.stderr)
+        return []
+    return records
+
+
+def _iterparse_nodes(xml: bytes):
+    """Yield (event, element) start/end pairs for <node> elements only.
+
+    With lxml the tag filter runs in libxml2; the stdlib fallback sees every
+    element and filters in Python.
+    """
+    ET, lxml_etree, _ = _xml_modules()
+    if lxml_etree is not None:
+        return lxml_etree.iterparse(io.BytesIO(xml), events=("start", "end"),
+                                    tag="node", resolve_entities=False)
+    return ((event, el) for event, el in ET.iterparse(io.BytesIO(xml), events=("start", "end"))
+            if el.tag == "node")
+
+
+@functools.cache
+def _xml_modules():
+    """Import XML parsers on first use -> (ElementTree, lxml.etree|None, errors).
+
+    File-mode runs and --help never parse lshw, so they skip these imports.
+    lxml is optional and gives libxml2-backed parsing for the lshw hot path.
+    """
+    import xml.etree.ElementTree as ET
+    try:
+        from lxml import etree as lxml_etree
+    except ImportError:
+        return ET, None, (ET.ParseError,)
+    return ET, lxml_etree, (ET.ParseError, lxml_etree.XMLSyntaxError)
+
+
+@functools.cache
+def _load_bson():
+    """Import bson (from pymongo) once; ImportError is re-raised on each call."""
+    import bson
+    return bson
+
+
+# Child elements of <node> that the DIMM/storage/NIC parsers read; anything
+# else (capabilities, resources, physid, ...) is skipped without being copied
+_LSHW_FIELDS = frozenset((
+    "description", "product", "vendor", "serial", "slot", "size", "clock",
+    "width", "logicalname", "businfo",
+))
+
+
+def _lshw_records(lshw: bytes | str | list[dict] | None) -> list[dict]:
+    """Accept either raw lshw XML or records from parse_lshw_nodes()."""
+    if isinstance(lshw, (bytes, str)):
+        return parse_lshw_nodes(lshw)
+    return lshw or []
+
+
+# DDR speed embedded in an lshw description, e.g. "DDR5 ... 4800 MHz (0.2 ns)"
+_DDR_MHZ_RE = re.compile(r"(\d{3,5})\s*MHz")
+# Everything but digits in an lshw speed setting, e.g. "4800000000Hz"
+_NON_DIGITS_RE = re.compile(r"\D+")
+# Lowercased descriptions of memory nodes that are not DIMMs: CPU caches
+# and the system board / motherboard aggregate
+_NON_DIMM_RE = re.compile(r"cache|system board|motherboard")
+# lshw size units -> bytes, and the GiB (DIMMs) / SI GB (disks) divisors
+_UNIT_TO_BYTES = {"bytes": 1, "KiB": 1024, "MiB": 1024 ** 2, "GiB": 1024 ** 3}
+_GIB = 1024 ** 3
+_GB = 1000 ** 3
+# Uppercased slot names that look like a DIMM slot
+_DIMM_SLOT_RE = re.compile(r"DIMM|CPU|MEM|PROC|BANK|SLOT|CHANNEL|P0_|P1_|NODE")
+
+
+def parse_lshw_dimms(lshw: bytes | list[dict] | None) -> list[dict]:
+    """Parse lshw XML (or its node records) to extract DIMM slot inventory.
+    
+    Filters out cache, system board, and memory controller nodes.
+    Only returns actual populated DIMM slots.
+    """
+    nodes = _lshw_records(lshw)
+    if not nodes:
         return []
 
     dimms = []
-    for node in root.iter("node"):
-        node_id = node.get("id", "")
-        node_class = node.get("class", "")
-        desc = _xml_text(node, "description", "").lower()
-        slot = _xml_text(node, "slot", "")
+    append = dimms.append  # bound once; called per populated slot
+    for node in nodes:
+        node_id = node["id"]
+        node_class = node["class"]
+        text = node["text"]
+        raw_desc = text.get("description", "")
+        desc = raw_desc.lower()
+        slot = text.get("slot", "")
 
         # --- EXCLUDE non-DIMM memory nodes ---
-        # Cache (L1, L2, L3)
-        if "cache" in desc:
-            continue
-        # System board / motherboard aggregate
-        if "system board" in desc or "motherboard" in desc:
+        # Cache (L1, L2, L3) and the system board / motherboard aggregate
+        if _NON_DIMM_RE.search(desc):
             continue
         # Parent memory controller nodes (have child <node> elements)
-        if node.find("node") is not None:
+        if node["has_child_node"]:
             continue
 
         # --- INCLUDE only actual DIMM slots ---
         is_bank = node_id.startswith("bank:")
         is_mem_slot = (
             node_class == "memory"
-            and node.find("slot") is not None
-            and node.find("size") is not None
+            and "slot" in text
+            and "size" in text
         )
         is_mem_numbered = (
             node_class == "memory"
             and ":" in node_id
-            and node.find("size") is not None
+            and "size" in text
         )
 
         if not (is_bank or is_mem_slot or is_mem_numbered):
@@ -428,44 +793,32 @@ def parse_lshw_dimms(lshw_xml: bytes | None) -> list[dict]:
 
         # Extra validation: slot name should look like a DIMM slot
         # (contains DIMM, CPU, MEM, PROC, or similar)
-        slot_upper = slot.upper()
-        if slot and not any(kw in slot_upper for kw in
-                           ("DIMM", "CPU", "MEM", "PROC", "BANK", "SLOT",
-                            "CHANNEL", "P0_", "P1_", "NODE")):
+        if slot and not _DIMM_SLOT_RE.search(slot.upper()):
             continue
 
-        vendor = _xml_text(node, "vendor", "")
-        product = _xml_text(node, "product", "")
-        serial = _xml_text(node, "serial", "")
+        vendor = text.get("vendor", "")
+        product = text.get("product", "")
+        serial = text.get("serial", "")
 
         # Size
-        size_el = node.find("size")
+        node_units = node["units"]
+        size_text = text.get("size")
         size_gb = 0
-        if size_el is not None and size_el.text:
+        if size_text:
             try:
-                raw_size = int(size_el.text)
-                units = size_el.get("units", "bytes")
-                if units == "bytes":
-                    size_gb = raw_size / (1024 ** 3)
-                elif units == "KiB":
-                    size_gb = raw_size / (1024 ** 2)
-                elif units == "MiB":
-                    size_gb = raw_size / 1024
-                elif units == "GiB":
-                    size_gb = raw_size
-                else:
-                    size_gb = raw_size / (1024 ** 3)
+                # Unknown units are treated as bytes
+                factor = _UNIT_TO_BYTES.get(node_units.get("size"), 1)
+                size_gb = int(size_text) * factor / _GIB
             except (ValueError, TypeError):
                 pass
 
         # Speed: extract from multiple sources
         clock_mhz = 0
-        raw_desc = _xml_text(node, "description", "")
 
         # Strategy 1: Parse speed from description field
         # e.g. "DDR5 Synchronous Registered (Buffered) 4800 MHz (0.2 ns)"
         # e.g. "DDR4 Synchronous 3200 MHz"
-        desc_speed = re.search(r'(\d{3,5})\s*MHz', raw_desc)
+        desc_speed = _DDR_MHZ_RE.search(raw_desc)
         if desc_speed:
             speed_val = int(desc_speed.group(1))
             if speed_val >= 800:  # Plausible DDR speed (DDR3-800 and above)
@@ -473,48 +826,44 @@ def parse_lshw_dimms(lshw_xml: bytes | None) -> list[dict]:
 
         # Strategy 2: Check <configuration><setting> elements (rare but possible)
         if not clock_mhz:
-            config = node.find("configuration")
-            if config is not None:
-                for setting in config.findall("setting"):
-                    sid = (setting.get("id", "") or "").lower()
-                    sval = setting.get("value", "") or ""
-                    if sid in ("speed", "configured_speed", "configured_clock_speed"):
-                        try:
-                            num = int("".join(c for c in sval if c.isdigit()))
-                            if num > 100000:
-                                clock_mhz = num // 1_000_000
-                            elif num > 0:
-                                clock_mhz = num
-                        except (ValueError, TypeError):
-                            pass
+            for sid, sval in node["settings"]:
+                if sid in ("speed", "configured_speed", "configured_clock_speed"):
+                    try:
+                        num = int(_NON_DIGITS_RE.sub("", sval))
+                        if num > 100000:
+                            clock_mhz = num // 1_000_000
+                        elif num > 0:
+                            clock_mhz = num
+                    except (ValueError, TypeError):
+                        pass
 
         # Strategy 3: <clock> element (bus clock — use only if nothing else works)
         if not clock_mhz:
-            clock_el = node.find("clock")
-            if clock_el is not None and clock_el.text:
+            clock_text = text.get("clock")
+            if clock_text:
                 try:
-                    hz = int(clock_el.text)
+                    hz = int(clock_text)
                     clock_mhz = hz // 1_000_000
                 except (ValueError, TypeError):
                     pass
 
         # Width
         width = 0
-        width_el = node.find("width")
-        if width_el is not None and width_el.text:
+        width_text = text.get("width")
+        if width_text:
             try:
-                width = int(width_el.text)
-                units = width_el.get("units", "bits")
+                width = int(width_text)
+                units = node_units.get("width", "bits")
                 if units == "bytes":
                     width *= 8
             except (ValueError, TypeError):
                 pass
 
         if size_gb > 0:  # Only include populated slots
-            dimms.append({
+            append({
                 "slot": slot,
-                "description": _xml_text(node, "description", ""),
-                "size_gb": round(size_gb, 1) if size_gb else 0,
+                "description": raw_desc,
+                "size_gb": round(size_gb, 1),
                 "vendor": vendor,
                 "product": product,
                 "serial": serial,
@@ -523,94 +872,67 @@ def parse_lshw_dimms(lshw_xml: bytes | None) -> list[dict]:
             })
 
     if not dimms:
-        mem_nodes = [(n.get("id",""), _xml_text(n, "description", ""))
-                     for n in root.iter("node") if n.get("class") == "memory"]
+        mem_nodes = [(n["id"], n["text"].get("description", ""))
+                     for n in nodes if n["class"] == "memory"]
         print(f"  lshw debug: {len(mem_nodes)} memory-class nodes: "
               f"{mem_nodes[:10]}", file=sys.stderr)
 
     return dimms
 
 
-def parse_lshw_storage(lshw_xml: bytes | None) -> list[dict]:
-    """Parse lshw XML for storage controller and disk details."""
-    if not lshw_xml:
-        return []
-    try:
-        root = ET.fromstring(lshw_xml)
-    except ET.ParseError:
-        return []
-
+def parse_lshw_storage(lshw: bytes | list[dict] | None) -> list[dict]:
+    """Parse lshw XML (or its node records) for storage controller and disk details."""
     disks = []
-    for node in root.iter("node"):
-        node_id = node.get("id", "")
-        node_class = node.get("class", "")
+    for node in _lshw_records(lshw):
+        node_id = node["id"]
+        node_class = node["class"]
         if node_class != "disk" and not node_id.startswith("disk"):
             continue
 
-        size_el = node.find("size")
+        text = node["text"]
+        size_text = text.get("size")
         size_gb = 0
-        if size_el is not None and size_el.text:
+        if size_text:
             try:
-                raw = int(size_el.text)
-                units = size_el.get("units", "bytes")
+                raw = int(size_text)
+                units = node["units"].get("size", "bytes")
                 if units == "bytes":
-                    size_gb = raw / (1000 ** 3)  # storage uses SI
+                    size_gb = raw / _GB  # storage uses SI
                 else:
                     size_gb = raw
             except (ValueError, TypeError):
                 pass
 
-        logicalname = _xml_text(node, "logicalname", "")
-        if isinstance(logicalname, list):
-            logicalname = logicalname[0] if logicalname else ""
-
         disks.append({
-            "device": logicalname,
-            "product": _xml_text(node, "product", ""),
-            "vendor": _xml_text(node, "vendor", ""),
-            "serial": _xml_text(node, "serial", ""),
+            "device": text.get("logicalname", ""),
+            "product": text.get("product", ""),
+            "vendor": text.get("vendor", ""),
+            "serial": text.get("serial", ""),
             "size_gb": round(size_gb, 1),
-            "description": _xml_text(node, "description", ""),
+            "description": text.get("description", ""),
         })
 
     return disks
 
 
-def parse_lshw_nics(lshw_xml: bytes | None) -> list[dict]:
-    """Parse lshw XML for network device product names, mapped by MAC address.
+def parse_lshw_nics(lshw: bytes | list[dict] | None) -> list[dict]:
+    """Parse lshw XML (or its node records) for network device product names.
     
     Returns list of dicts with: mac, product, vendor, description, businfo
     """
-    if not lshw_xml:
-        return []
-    try:
-        if isinstance(lshw_xml, bytes):
-            idx = lshw_xml.find(b"<?xml")
-            if idx > 0:
-                lshw_xml = lshw_xml[idx:]
-            elif idx < 0:
-                idx = lshw_xml.find(b"<list")
-                if idx < 0:
-                    idx = lshw_xml.find(b"<node")
-                if idx > 0:
-                    lshw_xml = lshw_xml[idx:]
-        root = ET.fromstring(lshw_xml)
-    except ET.ParseError:
-        return []
-
     nics = []
-    for node in root.iter("node"):
-        node_class = node.get("class", "")
-        if node_class != "network":
+    for node in _lshw_records(lshw):
+        if node["class"] != "network":
             continue
 
+        text = node["text"]
         # Get MAC from <serial> (lshw uses serial for MAC on NICs)
-        mac = _xml_text(node, "serial", "").lower()
-        product = _xml_text(node, "product", "")
-        vendor = _xml_text(node, "vendor", "")
-        desc = _xml_text(node, "description", "")
-        businfo = _xml_text(node, "businfo", "")  # e.g. "pci@0000:e5:00.0"
-        logicalname = _xml_text(node, "logicalname", "")
+        mac = text.get("serial", "").lower()
+        product = text.get("product", "")
+        vendor = text.get("vendor", "")
+        desc = text.get("description", "")
+        businfo = text.get("businfo", "")  # e.g. "pci@0000:e5:00.0"
+        logicalname = text.get("logicalname", "")
 
         if product or vendor:
             nics.append({
@@ -630,16 +952,13 @@ def enrich_nics_from_lshw(nics: list[dict], lshw_nics: list[dict]) -> list[dict]
     if not lshw_nics:
         return nics
 
-    # Build MAC -> lshw NIC lookup
-    by_mac = {}
-    for ln in lshw_nics:
-        mac = ln.get("mac", "").lower().strip()
-        if mac:
-            by_mac[mac] = ln
+    # Build MAC -> lshw NIC lookup (MACs normalised once per side; later
+    # entries win, as before)
+    by_mac = {m: ln for ln in lshw_nics
+              if (m := (ln.get("mac", "") or "").lower().strip())}
 
     for nic in nics:
-        mac = (nic.get("mac", "") or "").lower().strip()
-        lshw_nic = by_mac.get(mac)
+        lshw_nic = by_mac.get((nic.get("mac", "") or "").lower().strip())
         if lshw_nic:
             # Only override if MAAS didn't have product info
             if not nic.get("product"):
@@ -650,13 +969,6 @@ def enrich_nics_from_lshw(nics: list[dict], lshw_nics: list[dict]) -> list[dict]
     return nics
 
 
-def _xml_text(el, tag: str, default: str = "") -> str:
-    child = el.find(tag)
-    if child is not None and child.text:
-        return child.text.strip()
-    return default
-
-
 def parse_machine_resources_dimms(resources: dict | None) -> list[dict]:
     """Parse DIMM info from 40-maas-01-machine-resources JSON output.
     
@@ -723,68 +1035,57 @@ def parse_machine_resources_dimms(resources: dict | None) -> list[dict]:
     return [d for d in dimms if d.get("size_gb", 0) > 0]
 
 
+# SMBIOS Type 17 (Memory Device) block: the header line plus every following
+# non-blank line up to the next "Handle ..." record
+_DMI_BLOCK_RE = re.compile(
+    r"^[ \t]*Memory Device[ \t]*\n((?:(?![ \t]*Handle )[^\n]+\n?)*)", re.M
+)
+_DMI_LOCATOR_RE = re.compile(r"^[ \t]*Locator:[ \t]*(.*?)[ \t]*$", re.M)
+_DMI_CONF_SPEED_RE = re.compile(r"^[ \t]*Configured (?:Memory|Clock) Speed:[ \t]*(\d+)", re.M)
+_DMI_SPEED_RE = re.compile(r"^[ \t]*Speed:[ \t]*(\d+)", re.M)
+
+
+# Trailing channel letter + slot number of a DIMM locator ("A1", "0", ...)
+_DIMM_SLOT_SUFFIX_RE = re.compile(r"[A-Za-z]?\d+$")
+
+
+# Commissioning script names likely to embed dmidecode output
+_DMI_LIKELY_NAME_RE = re.compile(r"dmi|fru|memory|hardware|support")
+# A "Memory Device" block with a "Configured ..." line is well over 48
+# bytes of text, i.e. 64 base64 chars; shorter stdouts can't contain one
+_DMI_MIN_B64_LEN = 64
+
+
 def parse_dmidecode_dimm_speeds(dmidecode_text: str | None) -> dict:
     """Parse dmidecode output to extract DIMM speed per slot.
     
     Returns dict mapping slot name -> configured speed in MT/s.
-    Parses SMBIOS Type 17 (Memory Device) entries.
+    Parses SMBIOS Type 17 (Memory Device) entries, preferring the
+    configured speed and falling back to the rated Speed field.
     """
     if not dmidecode_text:
         return {}
-    
+    if "\r" in dmidecode_text:
+        # The patterns below are line-based on "\n"; CRLF captures would
+        # otherwise end every line (and Locator value) with "\r"
+        dmidecode_text = dmidecode_text.replace("\r\n", "\n")
+
     speeds = {}
-    current_slot = ""
-    current_speed = 0
-    in_memory_device = False
-    
-    for line in dmidecode_text.split("\n"):
-        stripped = line.strip()
-        
-        # Detect start of Type 17 block
-        if "Memory Device" in stripped and not "Mapped" in stripped:
-            in_memory_device = True
-            current_slot = ""
-            current_speed = 0
-            continue
-        
-        # Detect end of block (new Handle or empty section)
-        if in_memory_device and (stripped.startswith("Handle ") or 
-                                  (stripped == "" and current_slot)):
-            if current_slot and current_speed:
-                speeds[current_slot] = current_speed
-            if stripped.startswith("Handle "):
-                in_memory_device = False
-            continue
-        
-        if not in_memory_device:
+    for block in _DMI_BLOCK_RE.finditer(dmidecode_text):
+        body = block.group(1)
+        loc = _DMI_LOCATOR_RE.search(body)
+        if not loc or not loc.group(1):
             continue
-            
-        # Parse fields
-        if stripped.startswith("Locator:"):
-            current_slot = stripped.split(":", 1)[1].strip()
-        elif stripped.startswith("Configured Memory Speed:") or stripped.startswith("Configured Clock Speed:"):
-            val = stripped.split(":", 1)[1].strip()
-            try:
-                # Value like "4800 MT/s" or "4800 MHz"
-                num = int("".join(c for c in val.split()[0] if c.isdigit()))
-                if num > 0:
-                    current_speed = num
-            except (ValueError, IndexError):
-                pass
-        elif stripped.startswith("Speed:") and not current_speed:
-            # Fallback to Speed if Configured Speed not found
-            val = stripped.split(":", 1)[1].strip()
-            try:
-                num = int("".join(c for c in val.split()[0] if c.isdigit()))
-                if num > 0:
-                    current_speed = num
-            except (ValueError, IndexError):
-                pass
-    
-    # Flush last entry
-    if current_slot and current_speed:
-        speeds[current_slot] = current_speed
-    
+        speed = 0
+        m = _DMI_CONF_SPEED_RE.search(body)
+        if m:
+            speed = int(m.group(1))
+        if not speed:
+            m = _DMI_SPEED_RE.search(body)
+            if m:
+                speed = int(m.group(1))
+        if speed:
+            speeds[loc.group(1)] = speed
     return speeds
 
 
@@ -792,19 +1093,40 @@ def enrich_dimm_speeds(dimms: list[dict], dmidecode_speeds: dict) -> list[dict]:
     """Merge dmidecode speed data into DIMM list from lshw/machine-resources."""
     if not dmidecode_speeds:
         return dimms
+    # Index dmidecode slots by their trailing channel/number token (e.g.
+    # "A1" for both "DIMM_A1" and "CPU0_DIMM_A1") for partial matches
+    by_suffix: defaultdict[str, list[tuple[str, int]]] = defaultdict(list)
+    for dmi_slot, speed in dmidecode_speeds.items():
+        m = _DIMM_SLOT_SUFFIX_RE.search(dmi_slot)
+        if m:
+            by_suffix[m.group()].append((dmi_slot, speed))
     for dimm in dimms:
         slot = dimm.get("slot", "")
         if slot in dmidecode_speeds:
             dimm["clock_mhz"] = dmidecode_speeds[slot]
-        else:
-            # Try partial match (MAAS sometimes trims slot names)
-            for dmi_slot, speed in dmidecode_speeds.items():
-                if slot and (slot in dmi_slot or dmi_slot in slot):
+        elif slot:
+            # Try partial match (MAAS sometimes trims slot names): same-suffix
+            # candidates first, then a full scan only if the index misses
+            m = _DIMM_SLOT_SUFFIX_RE.search(slot)
+            candidates = by_suffix.get(m.group(), ()) if m else ()
+            for dmi_slot, speed in chain(candidates, dmidecode_speeds.items()):
+                if slot in dmi_slot or dmi_slot in slot:
                     dimm["clock_mhz"] = speed
                     break
     return dimms
 
 
+# Field name(s) per storage attribute: MAAS block devices vs machine-resources disks
+_STORAGE_KEYS_MAAS = {
+    "name": ("name",), "model": ("model",), "serial": ("serial",),
+    "firmware": ("firmware_version",),
+}
+_STORAGE_KEYS_RESOURCES = {
+    "name": ("name", "device_name"), "model": ("model", "model_name"),
+    "serial": ("serial", "serial_number"), "firmware": ("firmware_version", "firmware"),
+}
+
+
 def extract_storage_details(machine: dict, machine_resources: dict | None) -> list[dict]:
     """Extract storage devices including RAID member disks.
     
@@ -813,69 +1135,41 @@ def extract_storage_details(machine: dict, machine_resources: dict | None) -> li
     """
     devs = []
     seen_serials = set()
-    
-    # 1. MAAS physical block devices (top-level visible disks)
-    for bd in machine.get("physicalblockdevice_set", []):
-        size_bytes = bd.get("size", 0)
-        serial = bd.get("serial", "")
+
+    def emit(src: dict, keys: dict, name_default: str, dedupe: bool = True, **extra) -> None:
+        serial = _first(src, keys["serial"])
+        if dedupe and serial and serial in seen_serials:
+            return
+        size_bytes = src.get("size", 0)
         devs.append({
-            "name": bd.get("name", "?"),
-            "model": bd.get("model", ""),
+            "name": _first(src, keys["name"], name_default),
+            "model": _first(src, keys["model"]),
             "serial": serial,
-            "size_gb": round(size_bytes / (1000 ** 3), 1) if size_bytes else 0,
-            "firmware": bd.get("firmware_version", ""),
-            "numa_node": bd.get("numa_node", -1),
-            "type": "block",
-            "raid_member": False,
+            "size_gb": round(size_bytes / _GB, 1) if size_bytes else 0,
+            "firmware": _first(src, keys["firmware"]),
+            "numa_node": src.get("numa_node", -1),
+            **extra,
         })
         if serial:
             seen_serials.add(serial)
-    
+
+    # 1. MAAS physical block devices (top-level visible disks, never deduped)
+    for bd in machine.get("physicalblockdevice_set", []):
+        emit(bd, _STORAGE_KEYS_MAAS, "?", dedupe=False, type="block", raid_member=False)
+
     # 2. MAAS RAID sets — extract member disk info
     for raid in machine.get("raid_set", machine.get("raids", [])):
         raid_name = raid.get("name", "")
         raid_level = raid.get("level", "")
-        for member in raid.get("devices", []) + raid.get("spare_devices", []):
-            serial = member.get("serial", "")
-            if serial and serial in seen_serials:
-                continue
-            size_bytes = member.get("size", 0)
-            devs.append({
-                "name": member.get("name", "?"),
-                "model": member.get("model", ""),
-                "serial": serial,
-                "size_gb": round(size_bytes / (1000 ** 3), 1) if size_bytes else 0,
-                "firmware": member.get("firmware_version", ""),
-                "numa_node": member.get("numa_node", -1),
-                "type": "raid_member",
-                "raid_member": True,
-                "raid_name": raid_name,
-                "raid_level": raid_level,
-            })
-            if serial:
-                seen_serials.add(serial)
-    
+        for member in chain(raid.get("devices", ()), raid.get("spare_devices", ())):
+            emit(member, _STORAGE_KEYS_MAAS, "?", type="raid_member", raid_member=True,
+                 raid_name=raid_name, raid_level=raid_level)
+
     # 3. machine-resources storage — may have disks behind RAID controllers
     if machine_resources:
         for disk in machine_resources.get("storage", {}).get("disks", []):
-            serial = disk.get("serial", disk.get("serial_number", ""))
-            if serial and serial in seen_serials:
-                continue
-            name = disk.get("name", disk.get("device_name", ""))
-            size_bytes = disk.get("size", 0)
-            devs.append({
-                "name": name,
-                "model": disk.get("model", disk.get("model_name", "")),
-                "serial": serial,
-                "size_gb": round(size_bytes / (1000 ** 3), 1) if size_bytes else 0,
-                "firmware": disk.get("firmware_version", disk.get("firmware", "")),
-                "numa_node": disk.get("numa_node", -1),
-                "type": disk.get("type", "disk"),
-                "raid_member": False,
-            })
-            if serial:
-                seen_serials.add(serial)
-    
+            emit(disk, _STORAGE_KEYS_RESOURCES, "", type=disk.get("type", "disk"), raid_member=False)
+
     return devs
 
 
@@ -883,6 +1177,79 @@ def extract_storage_details(machine: dict, machine_resources: dict | None) -> li
 # MAAS MACHINE DATA EXTRACTION
 # ---------------------------------------------------------------------------
 
+def _first(d: dict, keys: tuple[str, ...], default=""):
+    """Value of the first key in ``keys`` that is present and not None/"".
+
+    Falsy values such as 0 (e.g. NUMA node 0) are kept.
+    """
+    for k in keys:
+        val = d.get(k)
+        if val is not None and val != "":
+            return val
+    return default
+
+
+# Alternative field names for the same PCI attribute across MAAS versions
+_PCI_VENDOR_KEYS = ("vendor", "vendor_name", "subvendor")
+_PCI_PRODUCT_KEYS = ("product", "product_name", "device")
+_PCI_PRODUCT_ID_KEYS = ("product_id", "device_id")
+_PCI_DRIVER_KEYS = ("driver", "driver_name", "module")
+_PCI_NUMA_KEYS = ("numa_node", "numa")
+_PCI_ADDRESS_KEYS = ("pci_address", "address", "bus_address", "id")
+_PCI_CLASS_KEYS = ("class", "pci_class", "class_id")
+_PCI_CLASSIFY_PRODUCT_KEYS = ("product", "device")
+
+_NET_DRIVERS = frozenset(("mlx5_core", "i40e", "ice", "bnxt_en", "igb", "ixgbe", "e1000"))
+_STOR_DRIVERS = frozenset(("nvme", "megaraid_sas", "mpt3sas", "ahci"))
+# PCI base class codes: 02 network controller, 01 mass storage controller
+_NET_CLASS_PREFIXES = frozenset(("02",))
+_STOR_CLASS_PREFIXES = frozenset(("01",))
+# Keywords searched for in lowercased PCI class / product strings
+_NET_CLASS_RE = re.compile(r"network|ethernet")
+_NET_PRODUCT_RE = re.compile(r"ethernet|connectx|network")
+_STOR_CLASS_RE = re.compile(r"storage|mass|raid|nvme|sata|sas")
+_STOR_PRODUCT_RE = re.compile(r"nvme|raid|sas|ssd")
+
+
+def _classify_pci_device(d: dict) -> str | None:
+    """Categorize a flat PCI entry as "network"/"storage" by class code, driver or product."""
+    pci_class = str(_first(d, _PCI_CLASS_KEYS)).lower()
+    driver = str(d.get("driver", "")).lower()
+    product = str(_first(d, _PCI_CLASSIFY_PRODUCT_KEYS)).lower()
+    # O(1) class-code / driver checks first, keyword scans only if those miss
+    cls2 = pci_class[:2]
+    if (cls2 in _NET_CLASS_PREFIXES or driver in _NET_DRIVERS
+            or _NET_CLASS_RE.search(pci_class) or _NET_PRODUCT_RE.search(product)):
+        return "network"
+    if (cls2 in _STOR_CLASS_PREFIXES or driver in _STOR_DRIVERS
+            or _STOR_CLASS_RE.search(pci_class) or _STOR_PRODUCT_RE.search(product)):
+        return "storage"
+    return None
+
+
+_HEX_RE = re.compile(r"[0-9a-fA-F]+")
+
+
+def _pci_entry(dev: dict) -> dict:
+    """Normalize one machine-resources PCI device (field names vary across MAAS versions)."""
+    entry = {
+        "vendor": _first(dev, _PCI_VENDOR_KEYS),
+        "vendor_id": dev.get("vendor_id", ""),
+        "product": _first(dev, _PCI_PRODUCT_KEYS),
+        "product_id": _first(dev, _PCI_PRODUCT_ID_KEYS),
+        "driver": _first(dev, _PCI_DRIVER_KEYS),
+        "numa_node": _first(dev, _PCI_NUMA_KEYS, -1),
+        "pci_address": _first(dev, _PCI_ADDRESS_KEYS),
+    }
+    # Clean up vendor_id/product_id: keep only hex IDs
+    for id_field in ("vendor_id", "product_id"):
+        val = str(entry[id_field]).strip()
+        # If it's a full vendor name instead of an ID, clear it
+        if len(val) > 6 and not _HEX_RE.fullmatch(val):
+            entry[id_field] = ""
+    return entry
+
+
 def extract_pci_devices(machine_resources: dict | None) -> dict:
     """Extract PCI devices from machine-resources JSON, grouped by category.
     
@@ -897,57 +1264,27 @@ def extract_pci_devices(machine_resources: dict | None) -> dict:
     top_keys = list(machine_resources.keys())
     log(f"machine-resources top-level keys: {top_keys}")
 
-    all_pci = []
-
-    # Strategy 1: Categorized arrays (network, storage, gpu)
-    for dev in machine_resources.get("network", []):
-        d = dict(dev) if isinstance(dev, dict) else {}
-        d["_category"] = "network"
-        all_pci.append(d)
-    for dev in machine_resources.get("storage", []):
-        d = dict(dev) if isinstance(dev, dict) else {}
-        d["_category"] = "storage"
-        all_pci.append(d)
-
-    # Strategy 2: Flat pci array with class-based categorization
-    for dev in machine_resources.get("pci", []):
-        d = dict(dev) if isinstance(dev, dict) else {}
-        if d.get("_category"):
-            continue
-        pci_class = str(d.get("class", d.get("pci_class", d.get("class_id", "")))).lower()
-        driver = str(d.get("driver", "")).lower()
-        product = str(d.get("product", d.get("device", ""))).lower()
-        vendor = str(d.get("vendor", d.get("vendor_name", ""))).lower()
-        
-        # Categorize by class code, driver name, or product keywords
-        if ("network" in pci_class or "ethernet" in pci_class or pci_class.startswith("02")
-            or driver in ("mlx5_core", "i40e", "ice", "bnxt_en", "igb", "ixgbe", "e1000")
-            or "ethernet" in product or "connectx" in product or "network" in product):
-            d["_category"] = "network"
-        elif ("storage" in pci_class or "mass" in pci_class or "raid" in pci_class or
-              "nvme" in pci_class or "sata" in pci_class or "sas" in pci_class or
-              pci_class.startswith("01")
-              or driver in ("nvme", "megaraid_sas", "mpt3sas", "ahci")
-              or "nvme" in product or "raid" in product or "sas" in product or "ssd" in product):
-            d["_category"] = "storage"
-        all_pci.append(d)
-
-    # Strategy 3: Nested under resources.pci or resources.network etc
+    # Categorized arrays (network, storage) keep their category; flat pci
+    # arrays, top-level or nested under resources, are classified per device
     res = machine_resources.get("resources", {})
+    sources = [
+        (machine_resources.get("network", []), "network"),
+        (machine_resources.get("storage", []), "storage"),
+        (machine_resources.get("pci", []), None),
+    ]
     if isinstance(res, dict):
-        for dev in res.get("pci", []):
-            d = dict(dev) if isinstance(dev, dict) else {}
-            if not d.get("_category"):
-                # Use same classification as above
-                pci_class = str(d.get("class", d.get("class_id", ""))).lower()
-                driver = str(d.get("driver", "")).lower()
-                if pci_class.startswith("02") or driver in ("mlx5_core", "i40e", "ice", "bnxt_en"):
-                    d["_category"] = "network"
-                elif pci_class.startswith("01") or driver in ("nvme", "megaraid_sas", "mpt3sas"):
-                    d["_category"] = "storage"
-            all_pci.append(d)
-
-    if not all_pci:
+        sources.append((res.get("pci", []), None))
+
+    seen = 0
+    for devices, category in sources:
+        for dev in devices:
+            seen += 1
+            d = dev if isinstance(dev, dict) else {}
+            cat = category or d.get("_category") or _classify_pci_device(d)
+            if cat in ("network", "storage"):
+                result[cat].append(_pci_entry(d))
+
+    if not seen:
         log(f"no PCI device arrays found in machine-resources")
         # Dump a sample of what IS there for debugging
         for k in top_keys[:10]:
@@ -959,65 +1296,42 @@ def extract_pci_devices(machine_resources: dict | None) -> dict:
             elif isinstance(val, dict):
                 log(f"  key '{k}': dict with keys {list(val.keys())[:10]}")
 
-    for dev in all_pci:
-        cat = dev.get("_category")
-        if cat not in ("network", "storage"):
-            continue
-        # Normalize field names across MAAS versions
-        entry = {
-            "vendor": dev.get("vendor", dev.get("vendor_name", dev.get("subvendor", ""))),
-            "vendor_id": dev.get("vendor_id", ""),
-            "product": dev.get("product", dev.get("product_name", dev.get("device", ""))),
-            "product_id": dev.get("product_id", dev.get("device_id", "")),
-            "driver": dev.get("driver", dev.get("driver_name", dev.get("module", ""))),
-            "numa_node": dev.get("numa_node", dev.get("numa", -1)),
-            "pci_address": dev.get("pci_address", dev.get("address", dev.get("bus_address", dev.get("id", "")))),
-        }
-        # Clean up vendor_id/product_id: keep only hex IDs
-        for id_field in ("vendor_id", "product_id"):
-            val = str(entry[id_field]).strip()
-            # If it's a full vendor name instead of an ID, clear it
-            if len(val) > 6 and not all(c in "0123456789abcdefABCDEF" for c in val):
-                entry[id_field] = ""
-        result[cat].append(entry)
-
     return result
 
 
 def extract_network_interfaces(machine: dict) -> list[dict]:
     """Extract physical NIC devices from MAAS machine detail (fallback for no machine-resources)."""
-    nics = []
-    for iface in machine.get("interface_set", []):
-        if iface.get("type") == "physical":
-            nics.append({
-                "name": iface.get("name", "?"),
-                "mac": iface.get("mac_address", ""),
-                "vendor": iface.get("vendor", ""),
-                "product": iface.get("product", ""),
-                "link_speed": iface.get("link_speed", 0),  # Mbps
-                "interface_speed": iface.get("interface_speed", 0),
-                "sriov_max_vf": iface.get("sriov_max_vf", 0),
-                "firmware": iface.get("firmware_version", ""),
-                "numa_node": iface.get("numa_node", -1),
-            })
-    return nics
+    return [
+        {
+            "name": iface.get("name", "?"),
+            "mac": iface.get("mac_address", ""),
+            "vendor": iface.get("vendor", ""),
+            "product": iface.get("product", ""),
+            "link_speed": iface.get("link_speed", 0),  # Mbps
+            "interface_speed": iface.get("interface_speed", 0),
+            "sriov_max_vf": iface.get("sriov_max_vf", 0),
+            "firmware": iface.get("firmware_version", ""),
+            "numa_node": iface.get("numa_node", -1),
+        }
+        for iface in machine.get("interface_set", ())
+        if iface.get("type") == "physical"
+    ]
 
 
 def extract_block_devices(machine: dict) -> list[dict]:
     """Extract storage devices from MAAS machine detail."""
-    devs = []
-    for bd in machine.get("physicalblockdevice_set", []):
-        size_bytes = bd.get("size", 0)
-        devs.append({
+    return [
+        {
             "name": bd.get("name", "?"),
             "model": bd.get("model", ""),
             "serial": bd.get("serial", ""),
-            "size_gb": round(size_bytes / (1000 ** 3), 1) if size_bytes else 0,
+            "size_gb": round(size_bytes / _GB, 1) if (size_bytes := bd.get("size", 0)) else 0,
             "firmware": bd.get("firmware_version", ""),
             "numa_node": bd.get("numa_node", -1),
             "block_size": bd.get("block_size", 0),
-        })
-    return devs
+        }
+        for bd in machine.get("physicalblockdevice_set", ())
+    ]
 
 
 def extract_numa_topology(machine: dict) -> list[dict]:
@@ -1029,20 +1343,38 @@ def extract_numa_topology(machine: dict) -> list[dict]:
             "memory_mb": n.get("memory", 0),
             "cores": n.get("cores", []),
         })
-    return sorted(nodes, key=lambda x: x["index"])
+    return sorted(nodes, key=itemgetter("index"))
 
 
 # ---------------------------------------------------------------------------
 # FETCH ALL DATA FROM MAAS
 # ---------------------------------------------------------------------------
 
-def fetch_from_maas(hostname: str, maas_url: str, api_key: str) -> dict:
+def connect_maas(maas_url: str, api_key: str,
+                 cache_dir: str | None = None, max_age: float = 3600) -> MAASClient:
+    log(f"Connecting to MAAS at {maas_url}")
+    client = MAASClient(maas_url, api_key, cache_dir=cache_dir, max_age=max_age)
+    if client.cache_dir:
+        log(f"  response cache: {client.cache_dir} (max age {max_age:g}s)")
+    return client
+
+
+def fetch_from_maas(hostname: str, maas_url: str, api_key: str,
+                    cache_dir: str | None = None, max_age: float = 3600,
+                    client: MAASClient | None = None) -> dict:
     """
     Connect to MAAS, resolve hostname, fetch everything needed for the report.
     Returns a dict with all data sources.
+
+    With cache_dir set, raw API responses are reused from disk for up to
+    max_age seconds, so re-running a report skips the network entirely.
+    After that, cached script results are kept as long as MAAS reports the
+    same updated timestamp for each of them.
+    Pass an existing client to reuse its session (and kept-alive
+    connections) across hosts; cache_dir/max_age are then the client's.
     """
-    log(f"Connecting to MAAS at {maas_url}")
-    client = MAASClient(maas_url, api_key)
+    if client is None:
+        client = connect_maas(maas_url, api_key, cache_dir=cache_dir, max_age=max_age)
 
     # Step 1: Resolve hostname
     log(f"Resolving hostname: {hostname}")
@@ -1051,29 +1383,50 @@ def fetch_from_maas(hostname: str, maas_url: str, api_key: str) -> dict:
     fqdn = machine.get("fqdn", hostname)
     log(f"  -> system_id={system_id}, fqdn={fqdn}, status={machine.get('status_name','?')}")
 
+    # Machine details and commissioning results are independent -- fetch
+    # them concurrently; everything below is served from these two payloads.
+    log("Fetching machine details and commissioning results...")
+    prefetched = client.fetch_all(system_id)
+
+    # The per-source lookups below read the cached commissioning payload;
+    # run them together so lshw's BSON fallback (the only remaining GET)
+    # overlaps with the script JSON / machine-resources extraction.
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=client.FETCH_WORKERS) as pool:
+        pending = {
+            "install": pool.submit(client.get_script_json, system_id, SCRIPT_ALIASES["install"]),
+            "inventory": pool.submit(client.get_script_json, system_id, SCRIPT_ALIASES["inventory"]),
+            "stress": pool.submit(client.get_script_json, system_id, SCRIPT_ALIASES["stress"]),
+            "lshw": pool.submit(client.get_machine_lshw, system_id),
+            "resources": pool.submit(client.get_machine_resources, system_id),
+            "scripts": pool.submit(client.get_all_commissioning_scripts, system_id),
+        }
+    fetched = {key: future.result() for key, future in pending.items()}
+
     # Step 2: Fetch GPU commissioning scripts
     log("Fetching GPU commissioning script outputs...")
-    install_data = client.get_script_json(system_id, SCRIPT_ALIASES["install"])
+    install_data = fetched["install"]
     if install_data:
         log(f"  90-install: loaded ({install_data.get('verdict', {}).get('overall', '?')})")
     else:
         log("  90-install: not found or no JSON output")
 
-    inventory_data = client.get_script_json(system_id, SCRIPT_ALIASES["inventory"])
+    inventory_data = fetched["inventory"]
     if inventory_data:
         log(f"  98-inventory: loaded ({inventory_data.get('verdict', {}).get('overall', '?')})")
     else:
         log("  98-inventory: not found or no JSON output")
 
-    stress_data = client.get_script_json(system_id, SCRIPT_ALIASES["stress"])
+    stress_data = fetched["stress"]
     if stress_data:
         log(f"  99-stress: loaded ({stress_data.get('verdict', {}).get('overall', '?')})")
     else:
         log("  99-stress: not found or no JSON output")
 
     # Step 3: Fetch full machine hardware details
-    log("Fetching machine hardware details...")
-    details = client.get_machine_details(system_id)
+    log("Machine hardware details:")
+    details = prefetched["details"]
     hw_info = details.get("hardware_info", {})
     log(f"  Platform: {hw_info.get('system_vendor', '?')} {hw_info.get('system_product', '?')}")
     log(f"  CPU: {hw_info.get('cpu_model', '?')} ({details.get('cpu_count', '?')} cores)")
@@ -1087,11 +1440,13 @@ def fetch_from_maas(hostname: str, maas_url: str, api_key: str) -> dict:
 
     # Step 4: Fetch lshw for DIMM inventory + NIC product names
     log("Fetching lshw data...")
-    lshw_xml = client.get_machine_lshw(system_id)
+    lshw_xml = fetched["lshw"]
     dimms = []
     if lshw_xml:
         log(f"  lshw XML: {len(lshw_xml)} bytes")
-        dimms = parse_lshw_dimms(lshw_xml)
+        # Parse once; DIMM and NIC extraction share the node records
+        lshw_nodes = parse_lshw_nodes(lshw_xml)
+        dimms = parse_lshw_dimms(lshw_nodes)
         if dimms:
             log(f"  DIMMs: {len(dimms)} slots populated")
             # Debug: show first DIMM speed for verification
@@ -1101,7 +1456,7 @@ def fetch_from_maas(hostname: str, maas_url: str, api_key: str) -> dict:
             log(f"  DIMMs: 0 (XML parsed OK but no DIMM nodes matched)")
 
         # Enrich NIC list with product names from lshw
-        lshw_nics = parse_lshw_nics(lshw_xml)
+        lshw_nics = parse_lshw_nics(lshw_nodes)
         if lshw_nics:
             log(f"  lshw NICs: {len(lshw_nics)} network devices")
             for ln in lshw_nics[:3]:
@@ -1114,7 +1469,7 @@ def fetch_from_maas(hostname: str, maas_url: str, api_key: str) -> dict:
 
     # Step 4b: Fetch machine-resources for additional hardware detail
     log("Fetching machine-resources data...")
-    machine_resources = client.get_machine_resources(system_id)
+    machine_resources = fetched["resources"]
     pci_devices = {"network": [], "storage": []}
     if machine_resources:
         log(f"  machine-resources: loaded ({len(machine_resources)} top-level keys)")
@@ -1133,30 +1488,44 @@ def fetch_from_maas(hostname: str, maas_url: str, api_key: str) -> dict:
     # Step 4c: Fetch dmidecode for accurate DIMM speeds
     log("Fetching dmidecode for DIMM speed data...")
     dmidecode_text = None
-    # Try multiple script names for dmidecode
+    try:
+        results = client.get_commissioning_results(system_id).get("results", [])
+    except Exception:
+        results = []
+    by_name = {r.get("name", ""): r for r in results}
+    # Try likely dmidecode script names first (exact, then partial name
+    # match), all against the cached results; stdouts decode on demand
     for dmi_name in ["dmidecode", "00-maas-06-get-fruid-data", "maas-dmidecode",
                      "maas-get-fruid-api-data", "maas-support-info"]:
-        text = client.get_commissioning_script_stdout(system_id, dmi_name)
-        if text and "Memory Device" in text and "Configured" in text:
+        result = by_name.get(dmi_name)
+        if result is None or not _result_stdout(result):
+            result = next((r for r in results
+                           if dmi_name in r.get("name", "").lower() and _result_stdout(r)),
+                          None)
+        if result is None:
+            continue
+        text = _result_text(result)
+        if "Memory Device" in text and "Configured" in text:
             dmidecode_text = text
             log(f"  dmidecode: found via '{dmi_name}'")
             break
     if not dmidecode_text:
-        # Scan ALL commissioning results for any script containing dmidecode output
-        try:
-            all_results = client.get_commissioning_results(system_id)
-            for result in all_results.get("results", []):
-                name = result.get("name", "")
-                stdout_b64 = result.get("stdout", "")
-                if not stdout_b64:
-                    continue
-                text = base64.b64decode(stdout_b64).decode("utf-8", errors="replace")
-                if "Memory Device" in text and "Configured" in text:
-                    dmidecode_text = text
-                    log(f"  dmidecode: found embedded in '{name}'")
-                    break
-        except Exception:
-            pass
+        # Scan ALL commissioning results for any script containing dmidecode
+        # output, likely-named scripts first. Outputs too short to hold a
+        # Memory Device block are skipped without decoding.
+        likely, others = [], []
+        for r in results:
+            (likely if _DMI_LIKELY_NAME_RE.search(r.get("name", "").lower()) else others).append(r)
+        for result in chain(likely, others):
+            if "_decoded" not in result and len(result.get("stdout") or "") < _DMI_MIN_B64_LEN:
+                continue
+            if not _result_stdout(result):
+                continue
+            text = _result_text(result)
+            if "Memory Device" in text and "Configured" in text:
+                dmidecode_text = text
+                log(f"  dmidecode: found embedded in '{result.get('name', '')}'")
+                break
     
     if dmidecode_text and "Memory Device" in dmidecode_text:
         dmi_speeds = parse_dmidecode_dimm_speeds(dmidecode_text)
@@ -1216,7 +1585,7 @@ def fetch_from_maas(hostname: str, maas_url: str, api_key: str) -> dict:
 
     # Step 5: List all commissioning scripts (for metadata)
     log("Fetching commissioning script list...")
-    all_scripts = client.get_all_commissioning_scripts(system_id)
+    all_scripts = fetched["scripts"]
     log(f"  {len(all_scripts)} total commissioning scripts")
 
     return {
@@ -1242,23 +1611,39 @@ def fetch_from_maas(hostname: str, maas_url: str, api_key: str) -> dict:
 # LOGGING
 # ---------------------------------------------------------------------------
 
-_quiet = False
+def _log(msg: str):
+    print(f"[maas-report] {msg}", file=sys.stderr)
+
+
+def _log_quiet(msg: str):
+    pass
 
-def log(msg: str):
-    if not _quiet:
-        print(f"[maas-report] {msg}", file=sys.stderr)
+
+# Rebound once by main(); --quiet swaps in the no-op
+log = _log
 
 
 # ---------------------------------------------------------------------------
 # SHARED HTML HELPERS (from v2.2)
 # ---------------------------------------------------------------------------
 
+_BADGES = {
+    vv: f'<span class="badge badge-{vv.lower()}">{vv}</span>'
+    for vv in ("PASS", "WARN", "FAIL")
+}
+_BADGES["N/A"] = '<span class="badge badge-na">N/A</span>'
+
+
 def badge(verdict: str) -> str:
+    # Verdicts normally arrive uppercase already: one dict lookup, no upper()
+    hit = _BADGES.get(verdict)
+    if hit:
+        return hit
     vv = verdict.upper()
-    cls = {"PASS": "pass", "WARN": "warn", "FAIL": "fail"}.get(vv, "na")
-    return f'<span class="badge badge-{cls}">{vv}</span>'
+    return _BADGES.get(vv) or f'<span class="badge badge-na">{vv}</span>'
 
 
+@functools.lru_cache(maxsize=128)
 def fmt_dur(s) -> str:
     if not s:
         return "--"
@@ -1267,7 +1652,7 @@ def fmt_dur(s) -> str:
     return f"{m}m {sec}s" if m else f"{sec}s"
 
 
-def v(val, unit="", na="--"):
+def _v(val, unit="", na="--"):
     if val is None or val == "" or val == "null":
         return f'<span class="dim">{na}</span>'
     if isinstance(val, float):
@@ -1275,14 +1660,34 @@ def v(val, unit="", na="--"):
     return f"{val}{unit}"
 
 
+# typed=True: 1, 1.0 and True hash alike but render differently
+_v_cached = functools.lru_cache(maxsize=1024, typed=True)(_v)
+
+
+def v(val, unit="", na="--"):
+    try:
+        return _v_cached(val, unit, na)
+    except TypeError:  # unhashable value (list/dict from odd JSON)
+        return _v(val, unit, na)
+
+
+@functools.lru_cache(maxsize=4096)
+def _esc(s: str) -> str:
+    """Escape a table cell, "--" when empty (cached: vendor/driver strings repeat per row)."""
+    return escape(s or "--")
+
+
+_ECC_LABELS = (
+    ("corrected_volatile", "CV"),
+    ("uncorrected_volatile", "UV"),
+    ("retired_pages_sbit", "RS"),
+    ("retired_pages_dbit", "RD"),
+)
+
+
 def ecc_summary(ecc: dict) -> str:
     parts = []
-    for key, label in [
-        ("corrected_volatile", "CV"),
-        ("uncorrected_volatile", "UV"),
-        ("retired_pages_sbit", "RS"),
-        ("retired_pages_dbit", "RD"),
-    ]:
+    for key, label in _ECC_LABELS:
         val = ecc.get(key)
         if val is not None and isinstance(val, (int, float)) and val > 0:
             parts.append(f'<span class="alert">{label}:{val}</span>')
@@ -1295,6 +1700,11 @@ def pcie_str(g: dict) -> str:
     gen = g.get("pcie_gen_max", g.get("pcie_gen_current", "?"))
     w_max = g.get("pcie_width_max", g.get("pcie_width_current", "?"))
     w_cur = g.get("pcie_width_current", w_max)
+    return _pcie_label(gen, w_max, w_cur)
+
+
+@functools.lru_cache(maxsize=64)
+def _pcie_label(gen, w_max, w_cur) -> str:
     s = f"Gen{gen} x{w_max}"
     # Only flag width degradation (real hardware issue: bad slot/riser/cable).
     # Gen dropping at idle (Gen4 -> Gen2) is normal GPU power saving.
@@ -1311,17 +1721,22 @@ def info_to_str(info) -> str:
     return ""
 
 
-def extract_num(text: str, pattern: str) -> str | None:
-    m = re.search(pattern, text)
+def extract_num(text: str, pattern: str | re.Pattern) -> str | None:
+    m = pattern.search(text) if isinstance(pattern, re.Pattern) else re.search(pattern, text)
     return m.group(1) if m else None
 
 
-def _resolve_gpu_id(r: dict) -> int | None:
+# "GPU <n>" in a DCGM result info string
+_RE_GPU_ID = re.compile(r'\bGPU\s+(\d+)\b')
+
+
+def _resolve_gpu_id(r: dict, info: str | None = None) -> int | None:
     """Try to determine real GPU ID from a single DCGM result entry.
 
     Returns the GPU index (int) if found, or None if indeterminate.
     Checks the explicit gpu_id field first, then parses the info string
     for patterns like 'GPU 3 calculated ...' or 'ECC is not enabled on GPU 7'.
+    Pass ``info`` when the caller already has info_to_str() of the result.
     """
     gid = r.get("gpu_id")
     if gid is not None:
@@ -1329,37 +1744,53 @@ def _resolve_gpu_id(r: dict) -> int | None:
             return int(gid)
         except (ValueError, TypeError):
             pass
-    info = info_to_str(r.get("info", ""))
-    m = re.search(r'\bGPU\s+(\d+)\b', info)
+    if info is None:
+        info = info_to_str(r.get("info", ""))
+    m = _RE_GPU_ID.search(info)
     if m:
         return int(m.group(1))
     return None
 
 
-def _find_remap_skipped_gpus(diag: dict, n_gpus: int) -> set[int]:
-    """Identify GPU IDs skipped due to row-remapping failure.
+def _scan_dcgm_results(diag: dict, n_gpus: int, all_ids: frozenset[int]
+                      ) -> tuple[list[tuple[list[str], list[int | None]]], set[int]]:
+    """Walk every DCGM result once.
 
-    Scans tests that carry explicit GPU IDs in their info strings to
-    determine which GPU(s) are absent when a row-remap skip is present.
+    Returns, per test, the info strings and directly resolved GPU IDs of
+    its results (None where unresolved or out of range), plus the GPU IDs
+    skipped due to row-remapping failure: for each test that has a
+    row-remap skip entry, the GPUs absent from its explicitly-identified
+    results.
     """
-    all_ids = set(range(n_gpus))
+    per_test = []
     skipped: set[int] = set()
     for t in diag.get("test_results", []):
+        infos: list[str] = []
+        resolved: list[int | None] = []
         found_ids: set[int] = set()
         has_remap_skip = False
         for r in t.get("results", []):
-            gid = _resolve_gpu_id(r)
+            info = info_to_str(r.get("info", ""))
+            gid = _resolve_gpu_id(r, info)
             if gid is not None and 0 <= gid < n_gpus:
                 found_ids.add(gid)
-            if "row remapping" in info_to_str(r.get("info", "")).lower():
+            else:
+                gid = None
+            if "row remapping" in info.lower():
                 has_remap_skip = True
+            infos.append(info)
+            resolved.append(gid)
         if has_remap_skip and found_ids:
             skipped |= (all_ids - found_ids)
-    return skipped
+        per_test.append((infos, resolved))
+    return per_test, skipped
 
 
 def _build_gpu_id_map(results_list: list[dict], n_gpus: int,
-                      remap_skipped: set[int]) -> list[int]:
+                      remap_skipped: set[int],
+                      all_ids: frozenset[int] | None = None,
+                      infos: list[str] | None = None,
+                      resolved: list[int | None] | None = None) -> list[int]:
     """Map each result-array index to the real GPU ID.
 
     Uses three strategies in order:
@@ -1367,30 +1798,38 @@ def _build_gpu_id_map(results_list: list[dict], n_gpus: int,
       2. Row-remapping skip entries matched to known-skipped GPUs
       3. Remaining unknowns filled by elimination against the full 0..n-1 set
     Falls back to array-index if nothing else resolves.
+    ``infos`` / ``resolved`` may carry each result's precomputed
+    info_to_str() and in-range _resolve_gpu_id() (see _scan_dcgm_results).
     """
+    if infos is None:
+        infos = [info_to_str(r.get("info", "")) for r in results_list]
     n = len(results_list)
     mapping: list[int | None] = [None] * n
+    known_ids: set[int] = set()  # GPU IDs assigned so far, kept in step with mapping
 
     # --- Pass 1: resolve from gpu_id field or info string ---
     for idx, r in enumerate(results_list):
-        gid = _resolve_gpu_id(r)
+        gid = resolved[idx] if resolved is not None else _resolve_gpu_id(r, infos[idx])
         if gid is not None and 0 <= gid < n_gpus:
             mapping[idx] = gid
+            known_ids.add(gid)
 
     # --- Pass 2: assign row-remapping skip entries ---
     remap_indices = [
-        idx for idx, r in enumerate(results_list)
+        idx for idx in range(n)
         if mapping[idx] is None
-        and "row remapping" in info_to_str(r.get("info", "")).lower()
+        and "row remapping" in infos[idx].lower()
     ]
-    unassigned_remap = sorted(remap_skipped - {g for g in mapping if g is not None})
+    unassigned_remap = sorted(remap_skipped - known_ids)
     if remap_indices and len(remap_indices) == len(unassigned_remap):
         for idx, gid in zip(remap_indices, unassigned_remap):
             mapping[idx] = gid
+        known_ids.update(unassigned_remap)
 
     # --- Pass 3: fill remaining unknowns by elimination ---
-    known_ids = {g for g in mapping if g is not None}
-    missing_ids = sorted(set(range(n_gpus)) - known_ids)
+    if all_ids is None:
+        all_ids = frozenset(range(n_gpus))
+    missing_ids = sorted(all_ids - known_ids)
     unknown_indices = [i for i in range(n) if mapping[i] is None]
     if len(missing_ids) == len(unknown_indices):
         for idx, gid in zip(unknown_indices, missing_ids):
@@ -1407,85 +1846,104 @@ def _build_gpu_id_map(results_list: list[dict], n_gpus: int,
 # STRESS METRIC EXTRACTION (from v2.2)
 # ---------------------------------------------------------------------------
 
-def build_stress_metrics(diag: dict, n_gpus: int) -> list[dict]:
+_RE_GFLOPS = re.compile(r'approximately\s+([\d.]+)\s+gigaflops')
+_RE_PCIE_BW = re.compile(r'bidirectional bandwidth[:\s]+([\d.]+)')
+_RE_PCIE_LAT = re.compile(r'GPU to Host latency[:\s]+([\d.]+)')
+_RE_POWER_AVG = re.compile(r'average power usage[:\s]+([\d.]+)')
+_RE_POWER_MAX = re.compile(r'max power[:\s]+([\d.]+)')
+_RE_STRESS_LVL = re.compile(r'stress level\s+([\d]+)')
+_RE_MEM_PCT = re.compile(r'\(([\d.]+)%\)')
+
+# DCGM test name -> (pattern, metric key) pairs pulled from its info strings
+_STRESS_METRIC_PATTERNS = {
+    "diagnostic": ((_RE_GFLOPS, "gflops"),),
+    "pcie": ((_RE_PCIE_BW, "pcie_bw"), (_RE_PCIE_LAT, "pcie_lat")),
+    "targeted_power": ((_RE_POWER_AVG, "power_avg"), (_RE_POWER_MAX, "power_max")),
+    "targeted_stress": ((_RE_STRESS_LVL, "stress_lvl"),),
+    "memory": ((_RE_MEM_PCT, "mem_pct"),),
+}
+
+def _stress_precompute(diag: dict, n_gpus: int) -> list[tuple[list[str], list[int]]]:
+    """Per test: (info strings, result index -> GPU ID map).
+
+    Shared by build_stress_metrics and render_test_matrix so each result is
+    resolved once per report. The row-remap skip set spans all tests, so
+    the GPU maps are built after one full scan.
+    """
+    all_ids = frozenset(range(n_gpus))
+    scanned, remap_skipped = _scan_dcgm_results(diag, n_gpus, all_ids)
+    return [
+        (infos, _build_gpu_id_map(t.get("results", []), n_gpus, remap_skipped,
+                                  all_ids, infos, resolved))
+        for t, (infos, resolved) in zip(diag.get("test_results", []), scanned)
+    ]
+
+
+def build_stress_metrics(diag: dict, n_gpus: int,
+                         precomputed: list[tuple[list[str], list[int]]] | None = None) -> list[dict]:
     metrics = [{} for _ in range(n_gpus)]
-    remap_skipped = _find_remap_skipped_gpus(diag, n_gpus)
+    per_test = precomputed or _stress_precompute(diag, n_gpus)
     results = diag.get("test_results", [])
-    for t in results:
-        name = t.get("test", "")
-        per_gpu = t.get("results", [])
-        gpu_map = _build_gpu_id_map(per_gpu, n_gpus, remap_skipped)
-        for idx, r in enumerate(per_gpu):
+    for t, (infos, gpu_map) in zip(results, per_test):
+        patterns = _STRESS_METRIC_PATTERNS.get(t.get("test", ""))
+        if not patterns:
+            continue  # no per-GPU metrics for this test
+        for idx, info in enumerate(infos):
             gpu_id = gpu_map[idx]
             if gpu_id >= n_gpus:
                 continue
-            info = info_to_str(r.get("info", ""))
             if not info:
                 continue
-            if name == "diagnostic":
-                val = extract_num(info, r'approximately\s+([\d.]+)\s+gigaflops')
+            gpu_metrics = metrics[gpu_id]
+            for pattern, key in patterns:
+                val = extract_num(info, pattern)
                 if val:
-                    metrics[gpu_id]["gflops"] = val
-            elif name == "pcie":
-                bw = extract_num(info, r'bidirectional bandwidth[:\s]+([\d.]+)')
-                lat = extract_num(info, r'GPU to Host latency[:\s]+([\d.]+)')
-                if bw:
-                    metrics[gpu_id]["pcie_bw"] = bw
-                if lat:
-                    metrics[gpu_id]["pcie_lat"] = lat
-            elif name == "targeted_power":
-                avg = extract_num(info, r'average power usage[:\s]+([\d.]+)')
-                mx = extract_num(info, r'max power[:\s]+([\d.]+)')
-                if avg:
-                    metrics[gpu_id]["power_avg"] = avg
-                if mx:
-                    metrics[gpu_id]["power_max"] = mx
-            elif name == "targeted_stress":
-                lvl = extract_num(info, r'stress level\s+([\d]+)')
-                if lvl:
-                    metrics[gpu_id]["stress_lvl"] = lvl
-            elif name == "memory":
-                pct = extract_num(info, r'\(([\d.]+)%\)')
-                if pct:
-                    metrics[gpu_id]["mem_pct"] = pct
+                    gpu_metrics[key] = val
     return metrics
 
 
-def render_test_matrix(diag: dict, n_gpus: int) -> str:
+# Matrix cell per DCGM status keyword, in match-priority order
+_MATRIX_CELLS = {
+    "pass": '<td><span class="dot-pass">&#10003;</span></td>',
+    "fail": '<td><span class="dot-fail">&#10007;</span></td>',
+    "warn": '<td><span class="dot-warn">!</span></td>',
+    "skip": '<td><span class="dot-skip">&mdash;</span></td>',
+}
+_MATRIX_CELL_UNKNOWN = '<td><span class="dot-skip">?</span></td>'
+
+
+def render_test_matrix(diag: dict, n_gpus: int,
+                       precomputed: list[tuple[list[str], list[int]]] | None = None) -> str:
     results = diag.get("test_results", [])
     if not results:
         return ""
-    remap_skipped = _find_remap_skipped_gpus(diag, n_gpus)
+    per_test = precomputed or _stress_precompute(diag, n_gpus)
     gpu_headers = "".join(f"<th>{i}</th>" for i in range(n_gpus))
-    rows = ""
-    for t in results:
+    parts = []
+    # Status totals over every result, including ones not mapped to a GPU column
+    total_pass = total_fail = total_skip = total_warn = 0
+    for t, (_, gpu_map) in zip(results, per_test):
         name = t.get("test", "?")
         per_gpu = t.get("results", [])
-        gpu_map = _build_gpu_id_map(per_gpu, n_gpus, remap_skipped)
         # Build cells indexed by real GPU ID
-        cells_by_gpu = ['<td><span class="dot-skip">?</span></td>'] * n_gpus
+        cells_by_gpu = [_MATRIX_CELL_UNKNOWN] * n_gpus
         for idx, r in enumerate(per_gpu):
+            st = r.get("status", "?").lower()
+            total_pass += "pass" in st
+            total_fail += "fail" in st
+            total_skip += "skip" in st
+            total_warn += "warn" in st
             gpu_id = gpu_map[idx]
             if gpu_id >= n_gpus:
                 continue
-            st = r.get("status", "?").lower()
-            if "pass" in st:
-                cell = '<td><span class="dot-pass">&#10003;</span></td>'
-            elif "fail" in st:
-                cell = '<td><span class="dot-fail">&#10007;</span></td>'
-            elif "warn" in st:
-                cell = '<td><span class="dot-warn">!</span></td>'
-            elif "skip" in st:
-                cell = '<td><span class="dot-skip">&mdash;</span></td>'
-            else:
-                cell = '<td><span class="dot-skip">?</span></td>'
+            # Exact status hit first; substring match for decorated statuses
+            cell = _MATRIX_CELLS.get(st) or next(
+                (html for marker, html in _MATRIX_CELLS.items() if marker in st),
+                _MATRIX_CELL_UNKNOWN,
+            )
             cells_by_gpu[gpu_id] = cell
-        rows += f'<tr><td class="test-name">{escape(name)}</td>{"".join(cells_by_gpu)}</tr>'
-
-    total_pass = sum(1 for t in results for r in t.get("results", []) if "pass" in r.get("status", "").lower())
-    total_fail = sum(1 for t in results for r in t.get("results", []) if "fail" in r.get("status", "").lower())
-    total_skip = sum(1 for t in results for r in t.get("results", []) if "skip" in r.get("status", "").lower())
-    total_warn = sum(1 for t in results for r in t.get("results", []) if "warn" in r.get("status", "").lower())
+        parts.append(f'<tr><td class="test-name">{escape(name)}</td>{"".join(cells_by_gpu)}</tr>')
+    rows = "".join(parts)
 
     summary_parts = []
     if total_pass: summary_parts.append(f'<span class="st-pass">{total_pass} passed</span>')
@@ -1506,47 +1964,97 @@ def render_test_matrix(diag: dict, n_gpus: int) -> str:
 # RENDER: NEW HARDWARE SECTIONS
 # ---------------------------------------------------------------------------
 
+# Slot/description markers for lshw entries that are not real DIMMs
+_DIMM_EXCLUDE_RE = re.compile(r"cache|l[123] |system board|motherboard")
+
+# DIMM speed suffix indexed by (value >= 1000): transfer rates read as MT/s
+_CLK_SUFFIX = (" MHz", " MT/s")
+
+# Row templates shared by every call; cells are escaped by the caller
+_DIMM_ROW = '''<tr>
+            <td class="mono">{slot}</td>
+            <td>{size}</td>
+            <td>{vendor}</td>
+            <td class="mono tiny">{product}</td>
+            <td class="mono tiny">{serial}</td>
+            <td class="mono">{clock}</td>
+        </tr>'''
+
+_PCI_ROW = '''<tr>
+            <td>{vendor}</td>
+            <td class="mono">{vendor_id}</td>
+            <td>{product}</td>
+            <td class="mono">{product_id}</td>
+            <td class="mono">{driver}</td>
+            <td>{numa}</td>
+            <td class="mono tiny">{pci_address}</td>
+        </tr>'''
+
+_NIC_ROW = '''<tr>
+            <td>{model}</td>
+            <td class="mono">{ports}</td>
+            <td class="mono tiny">{mac}</td>
+            <td>{sriov}</td>
+            <td>{numa}</td>
+        </tr>'''
+
+_STORAGE_ROW = '''<tr>
+            <td class="mono">{name}</td>
+            <td>{model}</td>
+            <td class="mono tiny">{serial}</td>
+            <td class="mono">{size_gb} GB</td>
+            <td class="mono tiny">{firmware}</td>
+            <td>{numa}</td>
+        </tr>'''
+
+# Commissioning status substring -> (dot class, icon); first match wins
+_SCRIPT_STATUS = (
+    ("pass", "dot-pass", "&#10003;"),
+    ("fail", "dot-fail", "&#10007;"),
+    ("skip", "dot-skip", "&mdash;"),
+)
+_SCRIPT_STATUS_OTHER = ("dot-warn", "!")
+
+_SCRIPT_ROW = '''<tr>
+            <td class="mono tiny">{name}</td>
+            <td><span class="{cls}">{icon}</span> {status}</td>
+            <td class="mono tiny">{runtime}</td>
+        </tr>'''
+
+
 def render_dimm_table(dimms: list[dict]) -> str:
     """Render DIMM inventory table."""
     if not dimms:
         return '<span class="dim">DIMM inventory not available</span>'
 
-    # Defensive filter: exclude cache, system board, and empty slots
-    _exclude = ("cache", "l1 ", "l2 ", "l3 ", "system board", "motherboard")
-    clean = []
+    # Filter, total and render in one pass
+    total_gb = 0.0
+    parts = []
     for d in dimms:
+        # Defensive filter: exclude cache, system board, and empty slots
         if d["size_gb"] <= 0:
             continue
-        slot_lower = (d.get("slot") or "").lower()
-        desc_lower = (d.get("description") or "").lower()
-        if any(kw in slot_lower or kw in desc_lower for kw in _exclude):
+        # NUL separator keeps a match from spanning slot and description
+        combined = f'{d.get("slot") or ""}\x00{d.get("description") or ""}'.lower()
+        if _DIMM_EXCLUDE_RE.search(combined):
             continue
-        clean.append(d)
-
-    if not clean:
-        return '<span class="dim">DIMM inventory not available</span>'
-
-    total_gb = sum(d["size_gb"] for d in clean)
-    populated = len(clean)
-
-    rows = ""
-    for d in clean:
+        total_gb += d["size_gb"]
         size = f'{d["size_gb"]:.0f} GB'
         clock_val = d["clock_mhz"]
-        if not clock_val:
-            clock = "--"
-        elif clock_val >= 1000:
-            clock = f'{clock_val} MT/s'
-        else:
-            clock = f'{clock_val} MHz'
-        rows += f'''<tr>
-            <td class="mono">{escape(d["slot"] or "--")}</td>
-            <td>{size}</td>
-            <td>{escape(d["vendor"] or "--")}</td>
-            <td class="mono tiny">{escape(d["product"] or "--")}</td>
-            <td class="mono tiny">{escape(d["serial"] or "--")}</td>
-            <td class="mono">{clock}</td>
-        </tr>'''
+        clock = f'{clock_val}{_CLK_SUFFIX[clock_val >= 1000]}' if clock_val else "--"
+        parts.append(_DIMM_ROW.format_map({
+            "slot": escape(d["slot"] or "--"),
+            "size": size,
+            "vendor": _esc(d["vendor"]),
+            "product": _esc(d["product"]),
+            "serial": escape(d["serial"] or "--"),
+            "clock": clock,
+        }))
+
+    if not parts:
+        return '<span class="dim">DIMM inventory not available</span>'
+    populated = len(parts)
+    rows = "".join(parts)
 
     return f'''
     <div class="table-note">{populated} DIMMs populated &mdash; {total_gb:.0f} GB total</div>
@@ -1566,17 +2074,18 @@ def render_pci_device_table(devices: list[dict], category: str) -> str:
     if not devices:
         return f'<span class="dim">No {category} devices found</span>'
 
-    rows = ""
+    parts = []
     for d in devices:
-        rows += f'''<tr>
-            <td>{escape(d.get("vendor","") or "--")}</td>
-            <td class="mono">{escape(str(d.get("vendor_id","") or "--"))}</td>
-            <td>{escape(d.get("product","") or "--")}</td>
-            <td class="mono">{escape(str(d.get("product_id","") or "--"))}</td>
-            <td class="mono">{escape(d.get("driver","") or "--")}</td>
-            <td>{v(d.get("numa_node", -1))}</td>
-            <td class="mono tiny">{escape(d.get("pci_address","") or "--")}</td>
-        </tr>'''
+        parts.append(_PCI_ROW.format_map({
+            "vendor": _esc(d.get("vendor","")),
+            "vendor_id": _esc(str(d.get("vendor_id","") or "")),
+            "product": _esc(d.get("product","")),
+            "product_id": _esc(str(d.get("product_id","") or "")),
+            "driver": _esc(d.get("driver","")),
+            "numa": v(d.get("numa_node", -1)),
+            "pci_address": escape(d.get("pci_address","") or "--"),
+        }))
+    rows = "".join(parts)
 
     return f'''
     <div class="table-note">{len(devices)} devices</div>
@@ -1591,6 +2100,14 @@ def render_pci_device_table(devices: list[dict], category: str) -> str:
     </div>'''
 
 
+@functools.lru_cache(maxsize=256)
+def _format_model(vendor: str, product: str) -> str:
+    """Card label: "vendor product" unless the product already names the vendor."""
+    if product and vendor and vendor.lower() not in product.lower():
+        return f'{vendor} {product}'
+    return product or vendor or "--"
+
+
 def _group_nics_by_card(nics: list[dict]) -> list[dict]:
     """Group NIC ports into physical cards.
     
@@ -1600,62 +2117,52 @@ def _group_nics_by_card(nics: list[dict]) -> list[dict]:
     if not nics:
         return []
 
-    # Build MAC prefix groups
-    groups: dict[str, list[dict]] = {}
+    # Build MAC prefix groups, tracking port count, MAC range and SR-IOV max as we go
+    groups: dict[str, dict] = {}
     ungrouped = []
     for n in nics:
-        mac = (n.get("mac", "") or "").lower().strip()
+        raw_mac = n.get("mac", "")
+        # strip() hands back the same object for clean MACs; lowercase only the prefix
+        mac = (raw_mac or "").strip()
         if len(mac) >= 14:  # at least "aa:bb:cc:dd:ee"
             # Use first 5 octets as card identifier
-            prefix = mac[:14]  # "aa:bb:cc:dd:ee"
-            groups.setdefault(prefix, []).append(n)
+            prefix = mac[:14].lower()  # "aa:bb:cc:dd:ee"
+            sriov = n.get("sriov_max_vf", 0) or 0
+            g = groups.get(prefix)
+            if g is None:
+                groups[prefix] = {"rep": n, "ports": 1, "sriov_max": sriov,
+                                  "min_mac": raw_mac, "max_mac": raw_mac}
+                continue
+            g["ports"] += 1
+            if sriov > g["sriov_max"]:
+                g["sriov_max"] = sriov
+            if raw_mac < g["min_mac"]:
+                g["min_mac"] = raw_mac
+            elif raw_mac > g["max_mac"]:
+                g["max_mac"] = raw_mac
         else:
             ungrouped.append(n)
 
     cards = []
-    for prefix, ports in groups.items():
+    for g in groups.values():
         # Use first port's product/vendor as the card identity
-        rep = ports[0]
-        product = rep.get("product", "") or ""
-        vendor = rep.get("vendor", "") or ""
-
-        if product and vendor and vendor.lower() not in product.lower():
-            model_str = f'{vendor} {product}'
-        elif product:
-            model_str = product
-        elif vendor:
-            model_str = vendor
-        else:
-            model_str = "--"
-
-        macs = sorted(p.get("mac", "") for p in ports)
-        sriov_max = max((p.get("sriov_max_vf", 0) or 0) for p in ports)
-        numa = rep.get("numa_node", -1)
-
+        rep = g["rep"]
         cards.append({
-            "model": model_str,
-            "ports": len(ports),
-            "macs": macs,
-            "sriov_max_vf": sriov_max,
-            "numa_node": numa,
+            "model": _format_model(rep.get("vendor", "") or "", rep.get("product", "") or ""),
+            "ports": g["ports"],
+            "mac_first": g["min_mac"],
+            "mac_last": g["max_mac"],
+            "sriov_max_vf": g["sriov_max"],
+            "numa_node": rep.get("numa_node", -1),
         })
 
     # Add ungrouped as single-port cards
     for n in ungrouped:
-        product = n.get("product", "") or ""
-        vendor = n.get("vendor", "") or ""
-        if product and vendor and vendor.lower() not in product.lower():
-            model_str = f'{vendor} {product}'
-        elif product:
-            model_str = product
-        elif vendor:
-            model_str = vendor
-        else:
-            model_str = "--"
         cards.append({
-            "model": model_str,
+            "model": _format_model(n.get("vendor", "") or "", n.get("product", "") or ""),
             "ports": 1,
-            "macs": [n.get("mac", "")],
+            "mac_first": n.get("mac", ""),
+            "mac_last": n.get("mac", ""),
             "sriov_max_vf": n.get("sriov_max_vf", 0) or 0,
             "numa_node": n.get("numa_node", -1),
         })
@@ -1670,25 +2177,25 @@ def render_nic_table(nics: list[dict]) -> str:
 
     cards = _group_nics_by_card(nics)
 
-    rows = ""
+    parts = []
     for c in cards:
         ports_str = f'{c["ports"]}-port' if c["ports"] > 1 else "1-port"
-        mac_display = c["macs"][0]
-        if len(c["macs"]) > 1:
+        mac_display = c["mac_first"]
+        if c["ports"] > 1:
             # Show range: first...last
-            last_octet_first = c["macs"][0].split(":")[-1]
-            last_octet_last = c["macs"][-1].split(":")[-1]
-            mac_display = f'{c["macs"][0]} &hellip; {last_octet_last}'
+            last_octet_last = c["mac_last"].split(":")[-1]
+            mac_display = f'{c["mac_first"]} &hellip; {last_octet_last}'
 
         sriov = f'{c["sriov_max_vf"]} VFs/port' if c["sriov_max_vf"] else "--"
 
-        rows += f'''<tr>
-            <td>{escape(c["model"])}</td>
-            <td class="mono">{ports_str}</td>
-            <td class="mono tiny">{mac_display}</td>
-            <td>{sriov}</td>
-            <td>{v(c["numa_node"])}</td>
-        </tr>'''
+        parts.append(_NIC_ROW.format_map({
+            "model": _esc(c["model"]),
+            "ports": ports_str,
+            "mac": mac_display,
+            "sriov": sriov,
+            "numa": v(c["numa_node"]),
+        }))
+    rows = "".join(parts)
 
     return f'''
     <div class="table-note">{len(cards)} physical adapters ({len(nics)} ports)</div>
@@ -1708,10 +2215,10 @@ def render_storage_table(block_devs: list[dict]) -> str:
     if not block_devs:
         return '<span class="dim">No block devices found</span>'
 
-    total_gb = sum(d["size_gb"] for d in block_devs)
-
-    rows = ""
+    total_gb = 0.0
+    parts = []
     for d in block_devs:
+        total_gb += d["size_gb"]
         name = d.get("name", "?")
         # Show RAID membership badge
         raid_badge = ""
@@ -1726,14 +2233,15 @@ def render_storage_table(block_devs: list[dict]) -> str:
         if dev_type and dev_type not in ("block", "disk"):
             type_badge = f' <span class="dim">({escape(dev_type)})</span>'
 
-        rows += f'''<tr>
-            <td class="mono">{escape(name)}{raid_badge}{type_badge}</td>
-            <td>{escape(d.get("model","") or "--")}</td>
-            <td class="mono tiny">{escape(d.get("serial","") or "--")}</td>
-            <td class="mono">{d["size_gb"]} GB</td>
-            <td class="mono tiny">{escape(d.get("firmware","") or "--")}</td>
-            <td>{v(d.get("numa_node", -1))}</td>
-        </tr>'''
+        parts.append(_STORAGE_ROW.format_map({
+            "name": f'{escape(name)}{raid_badge}{type_badge}',
+            "model": _esc(d.get("model","")),
+            "serial": escape(d.get("serial","") or "--"),
+            "size_gb": d["size_gb"],
+            "firmware": _esc(d.get("firmware","")),
+            "numa": v(d.get("numa_node", -1)),
+        }))
+    rows = "".join(parts)
 
     return f'''
     <div class="table-note">{len(block_devs)} devices &mdash; {total_gb:.0f} GB total</div>
@@ -1753,26 +2261,20 @@ def render_commissioning_scripts_table(scripts: list[dict]) -> str:
     if not scripts:
         return '<span class="dim">No commissioning data</span>'
 
-    rows = ""
+    parts = []
     for s in scripts:
         status = s["status"]
-        cls = ""
-        if "pass" in status.lower():
-            cls = "dot-pass"
-        elif "fail" in status.lower():
-            cls = "dot-fail"
-        elif "skip" in status.lower():
-            cls = "dot-skip"
-        else:
-            cls = "dot-warn"
-
-        icon = {"dot-pass": "&#10003;", "dot-fail": "&#10007;", "dot-skip": "&mdash;", "dot-warn": "!"}.get(cls, "?")
-
-        rows += f'''<tr>
-            <td class="mono tiny">{escape(s["name"])}</td>
-            <td><span class="{cls}">{icon}</span> {escape(status)}</td>
-            <td class="mono tiny">{escape(str(s.get("runtime","--")))}</td>
-        </tr>'''
+        sl = status.lower()
+        cls, icon = next(((c, i) for k, c, i in _SCRIPT_STATUS if k in sl), _SCRIPT_STATUS_OTHER)
+
+        parts.append(_SCRIPT_ROW.format_map({
+            "name": escape(s["name"]),
+            "cls": cls,
+            "icon": icon,
+            "status": escape(status),
+            "runtime": escape(str(s.get("runtime","--"))),
+        }))
+    rows = "".join(parts)
 
     return f'''
     <div class="tbl-wrap">
@@ -1783,10 +2285,53 @@ def render_commissioning_scripts_table(scripts: list[dict]) -> str:
     </div>'''
 
 
+_GPU_STRESS_COLS = '''
+            <th title="Compute GFLOPS from DCGM diagnostic test">GFLOPS</th>
+            <th title="PCIe bidirectional bandwidth">PCIe BW</th>
+            <th title="Average / Max power under targeted_power test">Power Stress</th>
+            <th title="DCGM targeted_stress relative level">Stress Lvl</th>
+            <th title="Memory test coverage percentage">Mem Test</th>'''
+
+# GPU table header row, indexed by has_stress; built once, shared by every report
+_GPU_HEADERS = tuple(
+    f'''<tr>
+        <th>#</th><th>Serial</th><th>PCIe</th><th>NUMA</th>
+        <th>Idle</th><th>Idle Power</th><th>ECC</th>
+        {stress_cols}
+    </tr>'''
+    for stress_cols in ("", _GPU_STRESS_COLS)
+)
+
+_MAAS_LINK = (
+    '<a href="{base}/r/machine/{system_id}/commissioning" class="maas-link" '
+    'target="_blank">View in MAAS &rarr;</a>'
+)
+
+
+@functools.lru_cache(maxsize=256)
+def _build_maas_link(maas_url: str, system_id: str) -> str:
+    """Header link to the machine's commissioning page in the MAAS UI."""
+    return _MAAS_LINK.format(base=maas_url.rstrip("/"), system_id=system_id)
+
+
+def _numa_gpu_tags(mapping: list[dict]) -> dict[int, str]:
+    """Group GPU-to-NUMA mapping entries into rendered GPU tags per NUMA node."""
+    nodes: defaultdict[int, list] = defaultdict(list)
+    for m in mapping:
+        nodes[m.get("numa_node", -1)].append(
+            f'<span class="numa-gpu">GPU {m.get("gpu_index","?")}</span>'
+        )
+    return {n: " ".join(tags) for n, tags in nodes.items()}
+
+
 # ---------------------------------------------------------------------------
 # MAIN REPORT GENERATOR
 # ---------------------------------------------------------------------------
 
+# Issue severity -> badge class (anything else renders as info)
+_SEV_CLASS = {"critical": "sev-crit", "warning": "sev-warn"}
+
+
 def generate_report(
     install: dict | None,
     inventory: dict | None,
@@ -1804,7 +2349,15 @@ def generate_report(
     dimms: list[dict] | None = None,
     all_scripts: list[dict] | None = None,
     hostname_override: str | None = None,
-) -> str:
+    as_bytes: bool = False,
+    stream: bool = False,
+) -> str | bytes | Iterator[str] | Iterator[bytes]:
+    """Render the HTML report.
+
+    as_bytes returns UTF-8 for writing straight to a file; stream returns
+    the document as an iterator of chunks instead of one joined string, so
+    a writer never holds a second full copy of the report.
+    """
     now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
 
     # -- Data sources: GPU scripts --
@@ -1829,101 +2382,107 @@ def generate_report(
     )
     serial_number = hw.get("system_serial", "") or sys_info.get("serial_number", "")
 
-    gpu_count = len(gpus) if gpus else (install or {}).get("install", {}).get("gpu_count", 0)
+    inst = (install or {}).get("install", {})
+    diag = (stress or {}).get("dcgm_diagnostics", {})
+    gpu_count = len(gpus) if gpus else inst.get("gpu_count", 0)
     if not gpu_count and stress:
         gpu_count = stress.get("system", {}).get("gpu_count", 0)
     gpu_model = gpus[0].get("name", "--") if gpus else "--"
-    inst = (install or {}).get("install", {})
-    diag = (stress or {}).get("dcgm_diagnostics", {})
 
     # MAAS link
-    maas_link = ""
-    if maas_url and system_id:
-        url = f"{maas_url.rstrip('/')}/r/machine/{system_id}/commissioning"
-        # Handle double /MAAS
-        if "/MAAS" in maas_url and not url.startswith(maas_url.rstrip("/")):
-            base = maas_url.rstrip("/").rsplit("/MAAS", 1)[0]
-            url = f"{base}/MAAS/r/machine/{system_id}/commissioning"
-        maas_link = f'<a href="{url}" class="maas-link" target="_blank">View in MAAS &rarr;</a>'
+    maas_link = _build_maas_link(maas_url, system_id) if maas_url and system_id else ""
 
     # Verdicts — collect issues first, filter false positives, then derive verdicts
     stages = [("Install", install), ("Inventory", inventory), ("Stress Test", stress)]
-    all_issues = []
-    for label, data in stages:
-        if data:
-            for iss in data.get("verdict", {}).get("issues", []):
-                c = dict(iss)
-                c["source"] = label
-                all_issues.append(c)
-
-    # Filter redundant/false-positive issues:
+    # Filter redundant/false-positive issues while collecting them:
     # - ECC counter query failures are irrelevant when DCGM stress test validated ECC health
     # - PCIe "link degradation" from inventory is a false positive: GPUs drop gen at idle
     #   (Gen4 -> Gen2) to save power. Only width degradation is a real hardware issue,
     #   and the inventory script (v2.0.3+) no longer flags gen-only differences.
     #   Filter it here to handle reports generated from older inventory data.
-    if stress:
-        all_issues = [i for i in all_issues
-                      if "counters unavailable" not in i.get("issue", "").lower()]
-    all_issues = [i for i in all_issues
-                  if "pcie link degradation" not in i.get("issue", "").lower()]
+    # Each stage's verdict block, looked up once for both passes below
+    stage_verdict = {label: data.get("verdict", {}) for label, data in stages if data}
+    all_issues = []
+    remaining_sources = set()
+    skip_ecc = bool(stress)
+    for label, verdict in stage_verdict.items():
+        for iss in verdict.get("issues", []):
+            txt = iss.get("issue", "").lower()
+            if skip_ecc and "counters unavailable" in txt:
+                continue
+            if "pcie link degradation" in txt:
+                continue
+            c = dict(iss)
+            c["source"] = label
+            all_issues.append(c)
+            remaining_sources.add(label)
 
     # Derive per-stage verdicts: if all issues for a stage were filtered out,
     # upgrade from WARN to PASS (FAIL stays as-is since those are real failures)
-    remaining_sources = {i["source"] for i in all_issues}
     verdicts = []
-    for label, data in stages:
-        if data:
-            raw = data.get("verdict", {}).get("overall", "N/A")
+    for label, _ in stages:
+        verdict = stage_verdict.get(label)
+        if verdict is not None:
+            raw = verdict.get("overall", "N/A")
             if raw == "WARN" and label not in remaining_sources:
                 raw = "PASS"
             verdicts.append((label, raw))
         else:
             verdicts.append((label, "N/A"))
 
+    # Worst verdict wins (first one on ties); nothing outranks FAIL, so stop there
     pri = {"FAIL": 0, "WARN": 1, "PASS": 2, "N/A": 3}
-    overall = min(verdicts, key=lambda x: pri.get(x[1], 3))[1]
-
-    # Script metadata
-    script_meta = []
-    for label, data in stages:
-        if data:
-            m = data.get("report_metadata", {})
-            script_meta.append(
-                f'{label} v{m.get("script_version","?")} &mdash; '
-                f'{m.get("generated_at","")} ({fmt_dur(m.get("duration_seconds", m.get("test_duration_seconds", 0)))})'
-            )
+    overall = verdicts[0][1]
+    best = pri.get(overall, 3)
+    for _, vv in verdicts:
+        if best == 0:
+            break
+        p = pri.get(vv, 3)
+        if p < best:
+            best, overall = p, vv
+
+    # Script metadata; per-stage durations are kept for the verdict cards
+    stage_meta = {label: data.get("report_metadata", {}) for label, data in stages if data}
+    stage_dur = {
+        label: m.get("duration_seconds", m.get("test_duration_seconds", 0))
+        for label, m in stage_meta.items()
+    }
+    script_meta = [
+        f'{label} v{m.get("script_version","?")} &mdash; '
+        f'{m.get("generated_at","")} ({fmt_dur(stage_dur[label])})'
+        for label, m in stage_meta.items()
+    ]
 
     # Stress metrics per GPU
-    stress_metrics = build_stress_metrics(diag, gpu_count) if stress and gpu_count else []
+    # Per-test GPU maps are resolved once and shared by the metrics and the matrix
+    stress_pre = _stress_precompute(diag, gpu_count) if diag.get("test_results") else None
+    stress_metrics = build_stress_metrics(diag, gpu_count, stress_pre) if stress and gpu_count else []
     has_stress = bool(stress_metrics and any(m for m in stress_metrics))
 
     # ===== BUILD HTML =====
 
     # Verdict cards
-    verdict_cards = ""
+    card_parts = []
     for label, vv in verdicts:
-        meta = ""
-        for l2, d in stages:
-            if l2 == label and d:
-                rm = d.get("report_metadata", {})
-                dur = rm.get("duration_seconds", rm.get("test_duration_seconds", 0))
-                if dur:
-                    meta = f'<div class="card-meta">{fmt_dur(dur)}</div>'
-        verdict_cards += f'''
+        dur = stage_dur.get(label)
+        meta = f'<div class="card-meta">{fmt_dur(dur)}</div>' if dur else ""
+        card_parts.append(f'''
         <div class="vcard">
             <div class="vcard-label">{label}</div>
             <div class="vcard-badge">{badge(vv)}</div>
             {meta}
-        </div>'''
+        </div>''')
+    verdict_cards = "".join(card_parts)
 
     # Issues
     if all_issues:
-        rows = ""
+        parts = []
         for iss in all_issues:
-            sev = iss.get("severity", "info")
-            cls = {"critical": "sev-crit", "warning": "sev-warn"}.get(sev, "sev-info")
-            rows += f'<tr><td><span class="sev {cls}">{sev.upper()}</span></td><td class="dim">{iss.get("source","")}</td><td>{iss.get("issue","")}</td></tr>'
+            get = iss.get
+            sev = get("severity", "info")
+            cls = _SEV_CLASS.get(sev, "sev-info")
+            parts.append(f'<tr><td><span class="sev {cls}">{sev.upper()}</span></td><td class="dim">{get("source","")}</td><td>{get("issue","")}</td></tr>')
+        rows = "".join(parts)
         issues_html = f'<table class="tbl issues"><thead><tr><th>Severity</th><th>Source</th><th>Issue</th></tr></thead><tbody>{rows}</tbody></table>'
     else:
         issues_html = '<div class="ok-msg">No issues detected across all stages</div>'
@@ -1982,35 +2541,26 @@ def generate_report(
         if cuda:
             sw_fields.append(("CUDA", escape(cuda)))
 
-    hw_rows = ""
-    for k, vv in hw_fields:
-        hw_rows += f'<tr><td class="kv-key">{k}</td><td>{vv}</td></tr>'
+    hw_rows = "".join(f'<tr><td class="kv-key">{k}</td><td>{vv}</td></tr>' for k, vv in hw_fields)
 
-    sw_rows = ""
-    for k, vv in sw_fields:
-        sw_rows += f'<tr><td class="kv-key">{k}</td><td>{vv}</td></tr>'
+    sw_rows = "".join(f'<tr><td class="kv-key">{k}</td><td>{vv}</td></tr>' for k, vv in sw_fields)
 
     # --- GPU table (inventory + stress) ---
-    stress_cols_hdr = ""
-    if has_stress:
-        stress_cols_hdr = '''
-            <th title="Compute GFLOPS from DCGM diagnostic test">GFLOPS</th>
-            <th title="PCIe bidirectional bandwidth">PCIe BW</th>
-            <th title="Average / Max power under targeted_power test">Power Stress</th>
-            <th title="DCGM targeted_stress relative level">Stress Lvl</th>
-            <th title="Memory test coverage percentage">Mem Test</th>'''
+    gpu_header = _GPU_HEADERS[has_stress]
 
-    gpu_header = f'''<tr>
-        <th>#</th><th>Serial</th><th>PCIe</th><th>NUMA</th>
-        <th>Idle</th><th>Idle Power</th><th>ECC</th>
-        {stress_cols_hdr}
-    </tr>'''
-
-    gpu_rows = ""
+    gpu_row_parts = []
+    n_stress = len(stress_metrics)
     for g in gpus:
-        idx = g.get("gpu_index", 0)
-        ecc = g.get("ecc", {})
-        sm = stress_metrics[idx] if idx < len(stress_metrics) else {}
+        # Pull every field once up front; the row template only reads locals
+        get = g.get
+        idx = get("gpu_index", 0)
+        serial = get("serial", "--")
+        numa_n = get("numa_node")
+        temp = get("temp_idle_c")
+        pw_draw = get("power_draw_w")
+        pw_lim = get("power_limit_w")
+        ecc = get("ecc", {})
+        sm = stress_metrics[idx] if idx < n_stress else {}
 
         stress_cells = ""
         if has_stress:
@@ -2029,77 +2579,64 @@ def generate_report(
                 <td class="mono">{v(s_lvl)}</td>
                 <td class="mono">{v(mem_pct, "%")}</td>'''
 
-        gpu_rows += f'''<tr>
+        gpu_row_parts.append(f'''<tr>
             <td>{idx}</td>
-            <td class="mono">{g.get("serial","--")}</td>
+            <td class="mono">{serial}</td>
             <td class="nowrap">{pcie_str(g)}</td>
-            <td>{v(g.get("numa_node"))}</td>
-            <td>{v(g.get("temp_idle_c"),"&deg;C")}</td>
-            <td class="nowrap">{v(g.get("power_draw_w"),"W")} / {v(g.get("power_limit_w"),"W")}</td>
+            <td>{v(numa_n)}</td>
+            <td>{v(temp,"&deg;C")}</td>
+            <td class="nowrap">{v(pw_draw,"W")} / {v(pw_lim,"W")}</td>
             <td>{ecc_summary(ecc)}</td>
             {stress_cells}
-        </tr>'''
+        </tr>''')
+    gpu_rows = "".join(gpu_row_parts)
 
+    # No inventory (CPU-only or smoke-test host): the GPU Fleet section is omitted
     gpu_section = ""
     if gpus:
         vram = gpus[0].get("vram_mib", "?")
         vram_type = gpus[0].get("vram_type", "?")
         gpu_info_line = f'<div class="table-note">{gpu_count}&times; {gpu_model} &mdash; {vram} MiB {vram_type}</div>'
-        gpu_section = f'''{gpu_info_line}
+        gpu_section = _SECTION.format("GPU Fleet", f'''{gpu_info_line}
         <div class="tbl-wrap">
             <table class="tbl gpu">
                 <thead>{gpu_header}</thead>
                 <tbody>{gpu_rows}</tbody>
             </table>
-        </div>'''
-    else:
-        gpu_section = '<div class="dim">No GPU inventory data available</div>'
+        </div>''')
 
     # --- NUMA topology ---
     # Prefer MAAS NUMA data (richer -- includes memory + cores per node) merged with GPU mapping
     numa_html = ""
     if numa_nodes_maas and len(numa_nodes_maas) > 0:
-        # Build GPU-to-NUMA mapping from our inventory data
-        gpu_numa_map: dict[int, list] = {}
-        if numa.get("gpu_to_numa_mapping"):
-            for m in numa["gpu_to_numa_mapping"]:
-                gpu_numa_map.setdefault(m.get("numa_node", -1), []).append(m)
+        # GPU tags per node from our inventory data, joined once
+        gpu_tags_by_numa = _numa_gpu_tags(numa.get("gpu_to_numa_mapping") or [])
 
-        blocks = ""
+        block_parts = []
         for n in numa_nodes_maas:
             idx = n["index"]
             mem = n.get("memory_mb", 0)
             cores = n.get("cores", [])
             mem_str = f'{mem // 1024} GB' if mem else "?"
 
-            gpu_tags = ""
-            if idx in gpu_numa_map:
-                gpu_tags = " ".join(
-                    f'<span class="numa-gpu">GPU {g.get("gpu_index","?")}</span>'
-                    for g in gpu_numa_map[idx]
-                )
-
+            gpu_tags = gpu_tags_by_numa.get(idx, "")
             core_str = f'{len(cores)} cores' if cores else "?"
 
-            blocks += f'''<div class="numa-node-row">
+            block_parts.append(f'''<div class="numa-node-row">
                 <span class="numa-id">NODE {idx}</span>
                 <span class="dim">{core_str}</span>
                 <span class="dim">{mem_str}</span>
                 {gpu_tags}
-            </div>'''
+            </div>''')
+        blocks = "".join(block_parts)
         numa_html = blocks
     elif numa.get("numa_available"):
         # Fallback to script-only NUMA data
-        nodes: dict[int, list] = {}
-        for m in numa.get("gpu_to_numa_mapping", []):
-            nodes.setdefault(m.get("numa_node", -1), []).append(m)
-        blocks = ""
+        nodes = _numa_gpu_tags(numa.get("gpu_to_numa_mapping", []))
+        block_parts = []
         for n in sorted(nodes):
-            gpu_tags = " ".join(
-                f'<span class="numa-gpu">GPU {g.get("gpu_index","?")}</span>'
-                for g in nodes[n]
-            )
-            blocks += f'<div class="numa-node-row"><span class="numa-id">NODE {n}</span>{gpu_tags}</div>'
+            block_parts.append(f'<div class="numa-node-row"><span class="numa-id">NODE {n}</span>{nodes[n]}</div>')
+        blocks = "".join(block_parts)
         numa_html = blocks
     else:
         numa_html = '<span class="dim">N/A</span>'
@@ -2122,7 +2659,7 @@ def generate_report(
     else:
         storage_html = render_storage_table(block_devices or [])
 
-    # --- Stress test matrix ---
+    # --- Stress test matrix (omitted entirely without 99-stress output) ---
     stress_section = ""
     if stress:
         level = diag.get("run_level", "?")
@@ -2134,33 +2671,81 @@ def generate_report(
             <span>Duration <strong>{fmt_dur(dur)}</strong></span>
             <span>Exit <strong>{exit_code}</strong></span>
         </div>'''
-        matrix = render_test_matrix(diag, gpu_count)
-        if matrix:
-            stress_section = stress_bar + matrix
-        else:
-            stress_section = stress_bar + '<div class="dim">No per-test results parsed</div>'
-    else:
-        stress_section = '<div class="dim">Stress test data not available</div>'
+        matrix = render_test_matrix(diag, gpu_count, stress_pre)
+        stress_section = _SECTION.format(
+            "DCGM Test Matrix",
+            stress_bar + (matrix or '<div class="dim">No per-test results parsed</div>'),
+        )
 
     # --- Commissioning scripts table ---
     scripts_html = render_commissioning_scripts_table(all_scripts or [])
 
-    run_info = "<br>".join(script_meta) if script_meta else "--"
+    run_info = "<br>".join(script_meta) or "--"
 
     # Data source indicator
     data_source = "MAAS API" if machine else "Local files"
 
     # ===== ASSEMBLE =====
-    html = f'''<!DOCTYPE html>
+    ctx = {
+        "css": _CSS_BYTES if as_bytes else _CSS_MIN,
+        "hostname": escape(hostname),
+        "product": escape(product),
+        "gpu_model": escape(gpu_model),
+        "gpu_count": gpu_count,
+        "overall_badge": badge(overall),
+        "maas_link": maas_link,
+        "verdict_cards": verdict_cards,
+        "issues_html": issues_html,
+        "hw_rows": hw_rows,
+        "numa_html": numa_html,
+        "sw_rows": sw_rows,
+        "gpu_section": gpu_section,
+        "stress_section": stress_section,
+        "dimm_html": dimm_html,
+        "nic_html": nic_html,
+        "storage_html": storage_html,
+        "scripts_html": scripts_html,
+        "version": __version__,
+        "data_source": data_source,
+        "now": now,
+        "run_info": run_info,
+    }
+    chunks = _iter_report_chunks(ctx, as_bytes)
+    if stream:
+        return chunks
+    # Template literals and rendered sections, joined once
+    return (b"" if as_bytes else "").join(chunks)
+
+
+def _iter_report_chunks(ctx: dict, as_bytes: bool) -> Iterator[str] | Iterator[bytes]:
+    """Yield template literals interleaved with the rendered sections in ctx."""
+    if as_bytes:
+        # Template text and CSS are pre-encoded; only rendered sections are encoded here
+        for literal, field in _REPORT_SEGMENTS_BYTES:
+            yield literal
+            if field is not None:
+                val = ctx[field]
+                yield val if isinstance(val, bytes) else str(val).encode("utf-8")
+        return
+    for literal, field in _REPORT_SEGMENTS:
+        yield literal
+        if field is not None:
+            yield str(ctx[field])
+
+
+# ---------------------------------------------------------------------------
+# HTML TEMPLATE -- page skeleton, split once into segments for generate_report()
+# ---------------------------------------------------------------------------
+_REPORT_TEMPLATE = '''<!DOCTYPE html>
 <html lang="en">
 <head>
 <meta charset="UTF-8">
 <meta name="viewport" content="width=device-width,initial-scale=1">
-<title>{escape(hostname)} &mdash; GPU Commissioning</title>
+<title>{hostname} &mdash; GPU Commissioning</title>
 <link rel="preconnect" href="https://fonts.googleapis.com">
 <link href="https://fonts.googleapis.com/css2?family=DM+Mono:wght@400;500&family=Outfit:wght@300;400;500;600;700&display=swap" rel="stylesheet">
 <style>
-{CSS}
+{css}
 </style>
 </head>
 <body>
@@ -2174,17 +2759,17 @@ def generate_report(
         </div>
         <div class="hdr-right">
             {maas_link}
-            <div class="overall">{badge(overall)}</div>
+            <div class="overall">{overall_badge}</div>
         </div>
     </div>
     <div class="title-block">
         <h1>GPU Commissioning Report</h1>
         <div class="subtitle">
-            <span class="hl">{escape(hostname)}</span>
+            <span class="hl">{hostname}</span>
             <span class="sep-dot"></span>
-            <span>{escape(product)}</span>
+            <span>{product}</span>
             <span class="sep-dot"></span>
-            <span>{gpu_count}&times; {escape(gpu_model)}</span>
+            <span>{gpu_count}&times; {gpu_model}</span>
         </div>
     </div>
 </header>
@@ -2208,17 +2793,7 @@ def generate_report(
     </div>
 </section>
 
-<section>
-    <div class="section-label">GPU Fleet</div>
-    {gpu_section}
-</section>
-
-<section>
-    <div class="section-label">DCGM Test Matrix</div>
-    {stress_section}
-</section>
-
-<section>
+{gpu_section}{stress_section}<section>
     <div class="section-label">Memory (DIMMs)</div>
     {dimm_html}
 </section>
@@ -2241,7 +2816,7 @@ def generate_report(
 
 <footer>
     <div class="foot-left">
-        <div class="foot-brand">nexgen-gpu-report v{__version__} &mdash; {data_source}</div>
+        <div class="foot-brand">nexgen-gpu-report v{version} &mdash; {data_source}</div>
         <div class="foot-ts">{now}</div>
     </div>
     <div class="foot-right">{run_info}</div>
@@ -2250,13 +2825,28 @@ def generate_report(
 </div>
 </body>
 </html>'''
-    return html
+
+# Optional report section; generate_report() leaves the field empty when there is no data
+_SECTION = '''<section>
+    <div class="section-label">{}</div>
+    {}
+</section>
+
+'''
+
+# (literal text, field name or None) pairs, parsed once at import
+_REPORT_SEGMENTS = tuple(
+    (literal, field) for literal, field, _, _ in string.Formatter().parse(_REPORT_TEMPLATE)
+)
+_REPORT_SEGMENTS_BYTES = tuple(
+    (literal.encode("utf-8"), field) for literal, field in _REPORT_SEGMENTS
+)
 
 
 # ---------------------------------------------------------------------------
 # CSS (shared with v2.2, extended for new sections)
 # ---------------------------------------------------------------------------
-CSS = '''
+_CSS_THEME = '''
 :root {
     --bg: #08090c;
     --page: #0d0f14;
@@ -2295,7 +2885,9 @@ CSS = '''
     section, .two-col > div { break-inside: avoid; }
     .tbl-wrap { overflow: visible; }
 }
+'''
 
+_CSS_BASE = '''
 * { margin:0; padding:0; box-sizing:border-box; }
 
 body {
@@ -2360,7 +2952,7 @@ header::after {
     padding: .35rem .8rem;
     border: 1px solid var(--edge2);
     border-radius: 6px;
-    transition: all .15s;
+    transition: background-color .15s, border-color .15s;
 }
 .maas-link:hover {
     background: var(--card2);
@@ -2394,7 +2986,9 @@ h1 {
     background: var(--txt3);
     display: inline-block;
 }
+'''
 
+_CSS_BADGE = '''
 .badge {
     display: inline-block;
     padding: .2rem .65rem;
@@ -2408,7 +3002,9 @@ h1 {
 .badge-warn { background: var(--amber-bg); color: var(--amber); border: 1px solid var(--amber-bd); }
 .badge-fail { background: var(--red-bg); color: var(--red); border: 1px solid var(--red-bd); }
 .badge-na   { background: var(--card); color: var(--txt3); border: 1px solid var(--edge); }
+'''
 
+_CSS_VERDICT = '''
 section { margin-bottom: 2rem; }
 .section-label {
     font-size: .62rem;
@@ -2458,7 +3054,9 @@ section { margin-bottom: 2rem; }
 .sev-crit { background: var(--red-bg); color: var(--red); }
 .sev-warn { background: var(--amber-bg); color: var(--amber); }
 .sev-info { background: var(--card2); color: var(--txt2); }
+'''
 
+_CSS_TABLE = '''
 .two-col {
     display: grid;
     grid-template-columns: 3fr 2fr;
@@ -2485,7 +3083,7 @@ section { margin-bottom: 2rem; }
     letter-spacing: .06em;
     white-space: nowrap;
 }
-.tbl tbody tr { transition: background .1s; }
+.tbl tbody tr { transition: background-color .1s; }
 .tbl tbody tr:hover { background: rgba(56,189,248,.03); }
 .tbl tbody tr:last-child td { border-bottom: none; }
 
@@ -2519,7 +3117,9 @@ section { margin-bottom: 2rem; }
 .dim { color: var(--txt2); }
 .hl { color: var(--accent); font-family: var(--mono); }
 .alert { color: var(--red); font-weight: 600; }
+'''
 
+_CSS_NUMA = '''
 .numa-node-row {
     display: flex;
     gap: .6rem;
@@ -2547,7 +3147,9 @@ section { margin-bottom: 2rem; }
     border-radius: 4px;
     color: var(--txt);
 }
+'''
 
+_CSS_MATRIX = '''
 .stress-bar {
     display: flex;
     gap: 2rem;
@@ -2586,7 +3188,9 @@ section { margin-bottom: 2rem; }
 .st-fail { color: var(--red); font-weight: 600; }
 .st-warn { color: var(--amber); font-weight: 600; }
 .st-skip { color: var(--txt3); }
+'''
 
+_CSS_FOOTER = '''
 footer {
     display: flex;
     justify-content: space-between;
@@ -2608,6 +3212,45 @@ footer::before {
 }
 .foot-right { text-align: right; line-height: 1.7; }
 '''
+_CSS_SECTIONS = (
+    _CSS_THEME, _CSS_BASE, _CSS_BADGE, _CSS_VERDICT,
+    _CSS_TABLE, _CSS_NUMA, _CSS_MATRIX, _CSS_FOOTER,
+)
+CSS = "\n".join(_CSS_SECTIONS)
+_CSS_MINIFY_RE = re.compile(r"/\*.*?\*/|\s*([{}:;,>])\s*|\s+", re.S)
+
+
+def _minify_css(css: str) -> str:
+    """Drop comments and collapse whitespace (none is significant around {}:;,> here)."""
+    return _CSS_MINIFY_RE.sub(lambda m: m.group(1) or " ", css).strip()
+
+
+_CSS_ROOT_RE = re.compile(r":root\{([^{}]*)\}")
+_CSS_DECL_RE = re.compile(r"--([\w-]+):([^;]*)(?:;|$)")
+_CSS_VAR_RE = re.compile(r"var\(--([\w-]+)\)")
+
+
+def _inline_css_vars(css: str) -> str:
+    """Replace var(--x) with its value for custom properties no later :root redefines.
+
+    Works on minified CSS. The first :root block is the theme; properties
+    that @media print (or any later :root) overrides stay as variables so
+    the print palette still applies, the rest become literals.
+    """
+    blocks = _CSS_ROOT_RE.findall(css)
+    if not blocks:
+        return css
+    theme = _CSS_DECL_RE.findall(blocks[0])
+    overridden = {name for block in blocks[1:] for name, _ in _CSS_DECL_RE.findall(block)}
+    fixed = {name: value for name, value in theme if name not in overridden}
+    kept = "".join(f"--{name}:{value};" for name, value in theme if name in overridden)
+    css = _CSS_ROOT_RE.sub(f":root{{{kept}}}" if kept else "", css, count=1)
+    return _CSS_VAR_RE.sub(lambda m: fixed.get(m.group(1), m.group(0)), css)
+
+
+# Minified, var-inlined and pre-encoded once per process, not per report
+_CSS_MIN = _inline_css_vars(_minify_css(CSS))
+_CSS_BYTES = _CSS_MIN.encode("utf-8")
 
 
 # ---------------------------------------------------------------------------
@@ -2618,15 +3261,89 @@ def load_json_file(path: str) -> dict | None:
     if path is None:
         return None
     try:
+        # Raw bytes straight into the (orjson-backed) decoder, no text-mode decode
         if path == "-":
-            return json.load(sys.stdin)
-        with open(path) as f:
-            return json.load(f)
+            return _json_loads(sys.stdin.buffer.read())
+        with open(path, "rb") as f:
+            return _json_loads(f.read())
     except (json.JSONDecodeError, FileNotFoundError, IOError) as e:
         print(f"Warning: Could not load {path}: {e}", file=sys.stderr)
         return None
 
 
+def parse_hosts(host_arg: str | None, hosts_file: str | None) -> list[str]:
+    """Hostnames from --host (comma-separated) and --hosts-file, deduplicated in order."""
+    hosts = [h.strip() for h in (host_arg or "").split(",")]
+    if hosts_file:
+        try:
+            with open(hosts_file) as f:
+                hosts += [ln.split("#", 1)[0].strip() for ln in f]
+        except OSError as e:
+            print(f"Error: Could not read hosts file {hosts_file}: {e}", file=sys.stderr)
+            sys.exit(1)
+    # A host listed twice is fetched and rendered once
+    return list(dict.fromkeys(h for h in hosts if h))
+
+
+def default_report_path(host: str) -> Path:
+    """reports/<host>-MAAS-validation.html relative to the repo root."""
+    reports_dir = Path(__file__).resolve().parent.parent / "reports"
+    reports_dir.mkdir(exist_ok=True)
+    return reports_dir / f"{host}-MAAS-validation.html"
+
+
+def report_for_host(host: str, client: MAASClient) -> Iterator[bytes]:
+    """Fetch one machine through a shared client; its report as streamed UTF-8 chunks."""
+    data = fetch_from_maas(host, client.base, "", client=client)
+    client.forget(data["system_id"])
+    return generate_report(
+        as_bytes=True,
+        stream=True,
+        install=data["install"],
+        inventory=data["inventory"],
+        stress=data["stress"],
+        maas_url=client.base,
+        system_id=data["system_id"],
+        machine=data["machine"],
+        hardware_info=data["hardware_info"],
+        nics=data["nics"],
+        block_devices=data["block_devices"],
+        storage_devices=data["storage_devices"],
+        pci_devices=data["pci_devices"],
+        numa_nodes_maas=data["numa_nodes_maas"],
+        dimms=data["dimms"],
+        all_scripts=data["all_scripts"],
+        hostname_override=data["hostname"],
+    )
+
+
+_WRITE_BUFFER = 1 << 20
+
+
+def write_report(out: Path, chunks: Iterable[bytes], gzip_copy: bool = False) -> None:
+    """Stream report chunks to out (and out.gz), never joining the whole document."""
+    out.parent.mkdir(parents=True, exist_ok=True)
+    gz_path = out.with_name(out.name + ".gz")
+    size = 0
+    # 1 MiB buffer: a whole report usually leaves in a single write() even on NFS
+    with open(out, "wb", buffering=_WRITE_BUFFER) as fh, contextlib.ExitStack() as stack:
+        gz = None
+        if gzip_copy:
+            import gzip
+
+            # Compress once here rather than on every HTTP serve; mtime=0 keeps output reproducible
+            gz = stack.enter_context(
+                gzip.GzipFile(gz_path, "wb", compresslevel=9, mtime=0))
+        for chunk in chunks:
+            fh.write(chunk)
+            if gz is not None:
+                gz.write(chunk)
+            size += len(chunk)
+    log(f"Report written: {out}")
+    if gzip_copy:
+        log(f"Compressed copy: {gz_path} ({size} -> {gz_path.stat().st_size} bytes)")
+
+
 # ---------------------------------------------------------------------------
 # CLI
 # ---------------------------------------------------------------------------
@@ -2645,6 +3362,9 @@ Examples:
   # Custom output name
   python3 nexgen-gpu-report.py --host EXAMPLE-GPU-001 -o custom-name.html
 
+  # Several machines in one run -- one report each under reports/
+  python3 nexgen-gpu-report.py --host EXAMPLE-GPU-001,EXAMPLE-GPU-002
+
   # File-based mode (backward compatible with v2.2)
   python3 nexgen-gpu-report.py \\
     --install 97.json --inventory 98.json --stress 99.json \\
@@ -2656,7 +3376,13 @@ Examples:
     maas_grp = p.add_argument_group("MAAS API mode")
     maas_grp.add_argument(
         "--host", metavar="HOSTNAME",
-        help="Machine hostname to look up in MAAS (e.g., EXAMPLE-GPU-001)",
+        help="Machine hostname to look up in MAAS (e.g., EXAMPLE-GPU-001); "
+             "comma-separate several to report on them in one run",
+    )
+    maas_grp.add_argument(
+        "--hosts-file", metavar="FILE",
+        help="File with one hostname per line (# comments allowed), "
+             "reported on like --host",
     )
     maas_grp.add_argument(
         "--maas-url", metavar="URL",
@@ -2666,6 +3392,16 @@ Examples:
         "--api-key", metavar="KEY",
         help="MAAS API key consumer:token:secret (default: $MAAS_API_KEY env var)",
     )
+    maas_grp.add_argument(
+        "--cache-dir", metavar="DIR", nargs="?", const="~/.cache/nexgen-maas",
+        help="Cache raw MAAS API responses on disk and reuse them on reruns "
+             "(default DIR: ~/.cache/nexgen-maas; off unless given)",
+    )
+    maas_grp.add_argument(
+        "--max-age", metavar="SECONDS", type=float, default=3600,
+        help="Maximum age of cached MAAS responses; older commissioning "
+             "results are reused if unchanged in MAAS (default: 3600)",
+    )
 
     # File-based mode (backward compat)
     file_grp = p.add_argument_group("file-based mode (backward compatible)")
@@ -2675,15 +3411,27 @@ Examples:
 
     # Output
     p.add_argument("--output", "-o", metavar="FILE", help="Output HTML file (default: stdout)")
+    p.add_argument(
+        "--gzip", action="store_true",
+        help="Also write FILE.gz next to the report (for web servers with gzip_static)",
+    )
     p.add_argument("--quiet", "-q", action="store_true", help="Suppress progress messages")
     p.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
 
     args = p.parse_args()
+    _load_dotenv()  # after parsing: --help/--version never need it
 
-    global _quiet
-    _quiet = args.quiet
+    global log
+    log = _log_quiet if args.quiet else _log
 
-    if args.host:
+    hosts = parse_hosts(args.host, args.hosts_file)
+    if len(hosts) > 1 and args.output:
+        p.error("-o takes a single host; with several, each report goes to "
+                "reports/<host>-MAAS-validation.html")
+    if args.gzip and not (hosts or args.output):
+        p.error("--gzip needs a report file; pass -o FILE")
+
+    if hosts:
         # === MAAS API MODE ===
         maas_url = args.maas_url or os.environ.get("MAAS_URL", "")
         api_key = args.api_key or os.environ.get("MAAS_API_KEY", "")
@@ -2697,25 +3445,40 @@ Examples:
                 "--host requires MAAS API key. Set --api-key or export MAAS_API_KEY=..."
             )
 
-        data = fetch_from_maas(args.host, maas_url, api_key)
-
-        html = generate_report(
-            install=data["install"],
-            inventory=data["inventory"],
-            stress=data["stress"],
-            maas_url=maas_url,
-            system_id=data["system_id"],
-            machine=data["machine"],
-            hardware_info=data["hardware_info"],
-            nics=data["nics"],
-            block_devices=data["block_devices"],
-            storage_devices=data["storage_devices"],
-            pci_devices=data["pci_devices"],
-            numa_nodes_maas=data["numa_nodes_maas"],
-            dimms=data["dimms"],
-            all_scripts=data["all_scripts"],
-            hostname_override=data["hostname"],
-        )
+        # One process and one client for the whole batch: imports, parsed
+        # templates, minified CSS and the kept-alive MAAS session are paid
+        # for once, not once per host
+        client = connect_maas(maas_url, api_key, cache_dir=args.cache_dir, max_age=args.max_age)
+        failed = []
+        # Hosts are fetched and rendered concurrently (their MAAS round trips
+        # overlap); reports are written here in the order hosts were given.
+        # Progress lines from different hosts may interleave.
+        from concurrent.futures import ThreadPoolExecutor
+
+        workers = min(len(hosts), client.HOST_WORKERS)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [(host, pool.submit(report_for_host, host, client)) for host in hosts]
+            for host, fut in futures:
+                # The report streams while it is written, so both steps can fail
+                try:
+                    html = fut.result()
+                    out = Path(args.output) if args.output else default_report_path(host)
+                    write_report(out, html, gzip_copy=args.gzip)
+                except SystemExit:
+                    # Lookup errors exit; in a batch, skip the host and keep going
+                    if len(hosts) == 1:
+                        raise
+                    failed.append(host)
+                except Exception as e:
+                    # HTTP/connection errors or bad payloads: same, but say why
+                    if len(hosts) == 1:
+                        raise
+                    print(f"Error: {host}: {type(e).__name__}: {e}", file=sys.stderr)
+                    failed.append(host)
+        if failed:
+            print(f"Error: no report for {len(failed)} of {len(hosts)} hosts: "
+                  f"{', '.join(failed)}", file=sys.stderr)
+            sys.exit(1)
 
     elif any([args.install, args.inventory, args.stress]):
         # === FILE-BASED MODE (backward compatible) ===
@@ -2728,31 +3491,24 @@ Examples:
             print("Error: No valid JSON loaded from files", file=sys.stderr)
             sys.exit(1)
 
+        # File output renders straight to UTF-8 bytes; stdout keeps text
         html = generate_report(
             install=install,
             inventory=inventory,
             stress=stress,
             maas_url=args.maas_url,
+            as_bytes=bool(args.output),
+            stream=True,
         )
+        if args.output:
+            write_report(Path(args.output), html, gzip_copy=args.gzip)
+        else:
+            sys.stdout.writelines(html)
+            sys.stdout.write("\n")
 
     else:
         p.error("Provide --host for MAAS API mode, or --install/--inventory/--stress for file mode")
 
-    # Write output — default to reports/ directory relative to repo root
-    output_path = args.output
-    if not output_path and args.host:
-        reports_dir = Path(__file__).resolve().parent.parent / "reports"
-        reports_dir.mkdir(exist_ok=True)
-        output_path = str(reports_dir / f"{args.host}-MAAS-validation.html")
-
-    if output_path:
-        out = Path(output_path)
-        out.parent.mkdir(parents=True, exist_ok=True)
-        out.write_text(html, encoding="utf-8")
-        log(f"Report written: {out}")
-    else:
-        print(html)
-
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,103 @@
+"""MAASClient concurrency: batch hosts must download commissioning data in parallel."""
+
+import json
+import sys
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "reporting"))
+
+import device_certificate as dc  # noqa: E402
+
+try:
+    import requests_oauthlib  # noqa: F401
+except ImportError:
+    requests_oauthlib = None
+
+TIMEOUT = 5  # seconds; only reached when the code under test serializes
+
+
+class _FakeSession:
+    """Stands in for the OAuth session and records how many GETs overlap.
+
+    Each GET blocks until `release` is set, or until `barrier` (when given)
+    has every party waiting, so overlap never depends on sleep timings.
+    """
+
+    def __init__(self, barrier=None):
+        self.barrier = barrier
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.calls = 0
+        self.in_flight = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def get(self, url, params=None):
+        from requests.models import Response
+
+        with self.lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        self.started.set()
+        try:
+            if self.barrier is not None:
+                try:
+                    self.barrier.wait()
+                except threading.BrokenBarrierError:
+                    pass  # serialized: the peak check reports it
+            else:
+                self.release.wait(TIMEOUT)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+        resp = Response()
+        resp.status_code = 200
+        resp.url = url
+        resp._content = json.dumps({"results": [{"name": "x", "stdout": ""}]}).encode()
+        return resp
+
+
+@unittest.skipIf(requests_oauthlib is None, "requests-oauthlib not installed")
+class CommissioningConcurrencyTest(unittest.TestCase):
+    def setUp(self):
+        self.client = dc.MAASClient("http://maas.invalid/MAAS", "a:b:c")
+
+    def test_batch_hosts_download_concurrently(self):
+        hosts = [f"sys{i}" for i in range(dc.MAASClient.HOST_WORKERS)]
+        session = self.client.session = _FakeSession(threading.Barrier(len(hosts), timeout=TIMEOUT))
+        with ThreadPoolExecutor(max_workers=len(hosts)) as pool:
+            list(pool.map(self.client.get_commissioning_results, hosts))
+        self.assertEqual(session.calls, len(hosts))
+        self.assertEqual(session.peak, len(hosts))
+
+    def test_same_machine_downloads_once(self):
+        session = self.client.session = _FakeSession()
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(self.client.get_commissioning_results, "sys0") for _ in range(4)]
+            session.started.wait(TIMEOUT)
+            session.release.set()
+            for fut in futures:
+                fut.result()
+        self.assertEqual(session.calls, 1)
+
+    def test_forget_does_not_wait_for_other_downloads(self):
+        session = self.client.session = _FakeSession()
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            download = pool.submit(self.client.get_commissioning_results, "sys0")
+            self.assertTrue(session.started.wait(TIMEOUT))
+            forget = threading.Thread(target=self.client.forget, args=("sys1",))
+            forget.start()
+            forget.join(TIMEOUT)
+            finished_during_download = not forget.is_alive()
+            session.release.set()
+            download.result()
+            forget.join()
+        self.assertTrue(finished_during_download)
+
+
+if __name__ == "__main__":
+    unittest.main()
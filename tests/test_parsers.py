@@ -0,0 +1,61 @@
+"""Parsers for commissioning script output."""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "reporting"))
+
+import device_certificate as dc  # noqa: E402
+
+
+class ExtractJsonTest(unittest.TestCase):
+    def test_object_with_surrounding_log_text(self):
+        self.assertEqual(dc._extract_json('log line\n{"a": {"b": 1}}\ntrailer'), {"a": {"b": 1}})
+
+    def test_truncated_output_returns_none(self):
+        self.assertIsNone(dc._extract_json('{"gpus": [{"a":0},'))
+        self.assertIsNone(dc._extract_json('log {"a": {"b": 1}, "c": '))
+
+    def test_malformed_object_does_not_yield_nested_fragment(self):
+        self.assertIsNone(dc._extract_json('{"a": {"b": 1} oops}'))
+
+    def test_skips_non_json_braces_before_payload(self):
+        self.assertEqual(dc._extract_json('warn {x} then {"a": 1}'), {"a": 1})
+
+
+_DMIDECODE = """\
+Handle 0x0040, DMI type 17, 92 bytes
+Memory Device
+\tSize: 64 GB
+\tLocator: P0_DIMM_A1
+\tSpeed: 4800 MT/s
+\tConfigured Memory Speed: 4400 MT/s
+
+Handle 0x0041, DMI type 17, 92 bytes
+Memory Device
+\tSize: 64 GB
+\tLocator: DIMM_A1
+\tSpeed: 5600 MT/s
+
+Handle 0x0042, DMI type 17, 92 bytes
+Memory Device
+\tSize: No Module Installed
+\tLocator: DIMM_B1
+\tSpeed: Unknown
+"""
+
+
+class DmidecodeSpeedTest(unittest.TestCase):
+    expected = {"P0_DIMM_A1": 4400, "DIMM_A1": 5600}
+
+    def test_lf(self):
+        self.assertEqual(dc.parse_dmidecode_dimm_speeds(_DMIDECODE), self.expected)
+
+    def test_crlf(self):
+        crlf = _DMIDECODE.replace("\n", "\r\n")
+        self.assertEqual(dc.parse_dmidecode_dimm_speeds(crlf), self.expected)
+
+
+if __name__ == "__main__":
+    unittest.main()